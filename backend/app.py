@@ -1,5 +1,3 @@
-print("DEBUG: App.py loaded successfully")
-
 import logging
 import os
 import warnings
@@ -7,7 +5,7 @@ import warnings
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from routes import auth as auth_routes
@@ -21,8 +19,10 @@ from routes import rollback as rollback_routes
 from routes import summary as summary_routes
 from routes import upload as upload_routes
 
-# Suppress warnings
-warnings.filterwarnings("ignore")
+# Suppress only the noisy third-party warnings; keep pandas
+# PerformanceWarning and friends visible
+warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+warnings.filterwarnings("ignore", category=DeprecationWarning, module="openpyxl")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -39,7 +39,11 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # FASTAPI APP SETUP
 # ============================================================================
 
-app = FastAPI(title="UPI Reconciliation API", version="1.0.0")
+app = FastAPI(
+    title="UPI Reconciliation API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # Add CORS middleware (fine-grained)
 ALLOWED_ORIGINS = [
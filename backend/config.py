@@ -8,6 +8,9 @@ from datetime import datetime
 # PROD = Real database, async jobs, dynamic generation
 APP_MODE = os.getenv("APP_MODE", "DEMO")  # DEMO | PROD
 
+# Read uploaded CSVs for reconciliation with pyarrow (when installed)
+FAST_IO = os.getenv("FAST_IO", "0") == "1"
+
 # File paths (absolute, anchored to backend/)
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_DIR = os.path.join(BASE_DIR, "data", "uploads")
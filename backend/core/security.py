@@ -1,6 +1,8 @@
 import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -14,15 +16,21 @@ SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+_sha256 = hashlib.sha256
+
 
 def hash_password(password: str) -> str:
     """Hash password using SHA256"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+    return _sha256(password.encode('utf-8')).hexdigest()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password"""
-    return hashlib.sha256(plain_password.encode('utf-8')).hexdigest() == hashed_password
+    """Verify password using a constant-time digest comparison"""
+    try:
+        expected = bytes.fromhex(hashed_password)
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(_sha256(plain_password.encode('utf-8')).digest(), expected)
 
 
 # Hardcoded user database (for now)
@@ -70,12 +78,29 @@ def authenticate_user(username: str, password: str):
 
 bearer_scheme = HTTPBearer()
 
+# Decoded-token cache: token -> (exp timestamp, user). Tokens are immutable
+# until they expire, so the signature check only needs to run once per token.
+_TOKEN_CACHE: Dict[str, Tuple[float, dict]] = {}
+_TOKEN_CACHE_MAX = 10_000
+
+
+def _prune_token_cache(now: float) -> None:
+    expired = [t for t, (exp, _) in _TOKEN_CACHE.items() if exp <= now]
+    for t in expired:
+        del _TOKEN_CACHE[t]
+    if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+        _TOKEN_CACHE.clear()
+
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ):
     """Get current user from JWT token"""
     token = credentials.credentials
+    now = time.time()
+    cached = _TOKEN_CACHE.get(token)
+    if cached is not None and cached[0] > now:
+        return cached[1]
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -84,6 +109,11 @@ def get_current_user(
         user = USERS_DB.get(username)
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
+        exp = payload.get("exp")
+        if exp is not None:
+            if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+                _prune_token_cache(now)
+            _TOKEN_CACHE[token] = (float(exp), user)
         return user
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -7,6 +7,7 @@ from loguru import logger
 from engines.settlement_engine import SettlementEngine
 from config import UPLOAD_DIR as CFG_UPLOAD_DIR
 from services.reporting import write_report
+from services.run_index import list_runs
 
 # Constants
 CBS = 'cbs'
@@ -1765,8 +1766,7 @@ DETAILED ANALYSIS:
         # contains a reversal (RC starts with 'RB'), flag the current RRN as HANGING.
         try:
             if run_id:
-                runs = [d for d in os.listdir(CFG_UPLOAD_DIR) if d.startswith('RUN_')]
-                runs = sorted(runs)
+                runs = list_runs(CFG_UPLOAD_DIR)
                 if run_id in runs:
                     idx = runs.index(run_id)
                     next_idx = idx + 1
@@ -1825,8 +1825,7 @@ DETAILED ANALYSIS:
                 root_upload = os.path.dirname(os.path.dirname(run_folder)) if os.path.basename(run_folder).startswith('cycle_') else os.path.join(os.path.dirname(run_folder))
                 # Better: list runs from UPLOAD_DIR
                 from config import UPLOAD_DIR as CFG_UPLOAD
-                runs = [d for d in os.listdir(CFG_UPLOAD) if d.startswith('RUN_')]
-                runs = sorted(runs)
+                runs = list_runs(CFG_UPLOAD)
                 if run_id in runs:
                     idx = runs.index(run_id)
                     prev_runs = []
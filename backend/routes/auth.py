@@ -1,6 +1,7 @@
 import logging
 from datetime import timedelta
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from core.security import (
@@ -19,7 +20,7 @@ router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 async def login(request: Request):
     """Login endpoint - returns JWT token"""
     try:
-        data = await request.json()
+        data = orjson.loads(await request.body())
         username = data.get("username")
         password = data.get("password")
 
@@ -1,18 +1,63 @@
-import json
+import asyncio
 import logging
 import os
-from typing import Optional
+import re
+import time
+from itertools import chain
+from typing import Dict, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from core.security import get_current_user
+from services.json_io import file_contains, read_json
+from services.recon_index import INDEXED_SECTIONS, find_indexed_record, open_recon_index, write_recon_index
+from services.run_index import list_runs
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["enquiry"])
 
+# RRNs are exactly 12 ASCII digits; str.isdigit() (and \d) would also accept
+# other Unicode digits
+_is_rrn = re.compile(r'[0-9]{12}').fullmatch
+
+# Recent "not found" answers, so bots retrying a missing id get their 404
+# without another lookup. Keys carry the latest run and its recon output's
+# mtime (None until recon writes it), so a new run or a (re)written output
+# invalidates them.
+_NOT_FOUND_TTL = 60.0
+_NOT_FOUND_MAX = 10_000
+_NOT_FOUND: Dict[tuple, float] = {}
+
+
+def _recently_not_found(key: tuple) -> bool:
+    expires = _NOT_FOUND.get(key)
+    if expires is None:
+        return False
+    if expires > time.monotonic():
+        return True
+    _NOT_FOUND.pop(key, None)
+    return False
+
+
+def _remember_not_found(key: tuple) -> None:
+    now = time.monotonic()
+    if len(_NOT_FOUND) >= _NOT_FOUND_MAX:
+        for stale in [k for k, expires in _NOT_FOUND.items() if expires <= now]:
+            del _NOT_FOUND[stale]
+        if len(_NOT_FOUND) >= _NOT_FOUND_MAX:
+            _NOT_FOUND.clear()
+    _NOT_FOUND[key] = now + _NOT_FOUND_TTL
+
+
+def _load_if_contains(path: str, probe: Optional[bytes]):
+    """Parse the JSON file at path, or return None if its bytes do not contain probe."""
+    if probe is not None and not file_contains(path, probe):
+        return None
+    return read_json(path)
+
 
 @router.get("/enquiry")
 async def enquiry(user: dict = Depends(get_current_user), rrn: str = Query(None), cycle: Optional[str] = Query(None), direction: Optional[str] = Query(None)):
@@ -21,27 +66,44 @@ async def enquiry(user: dict = Depends(get_current_user), rrn: str = Query(None)
         if not rrn:
             raise HTTPException(status_code=400, detail="rrn query param required")
 
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        runs = sorted(runs, reverse=True)
-        for r in runs:
+        runs = list_runs()
+        latest_mtime_ns = None
+        if runs:
+            try:
+                latest_mtime_ns = os.stat(os.path.join(UPLOAD_DIR, runs[-1], 'recon_output.json')).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        not_found_key = ('enquiry', rrn, runs[-1] if runs else None, len(runs), latest_mtime_ns)
+        if _recently_not_found(not_found_key):
+            raise HTTPException(status_code=404, detail="RRN not found in recent runs")
+
+        # Plain printable ASCII is serialized verbatim in JSON, so its raw bytes
+        # can be probed before paying for a full parse
+        probe = None
+        if rrn.isascii() and rrn.isprintable() and '"' not in rrn and '\\' not in rrn:
+            probe = rrn.encode('ascii')
+
+        for r in reversed(runs):
             run_folder = os.path.join(UPLOAD_DIR, r)
             recon_out = os.path.join(run_folder, 'recon_output.json')
             if not os.path.exists(recon_out):
                 continue
             try:
-                with open(recon_out, 'r') as f:
-                    data = json.load(f)
+                data = await asyncio.to_thread(_load_if_contains, recon_out, probe)
             except Exception:
                 continue
+            if data is None:
+                continue
 
-            if isinstance(data, dict) and not data.get('matched') and not data.get('unmatched'):
+            if isinstance(data, dict) and 'matched' not in data and 'unmatched' not in data:
                 if rrn in data:
-                    return JSONResponse(content={"run_id": r, "record": data.get(rrn)})
+                    return ORJSONResponse(content={"run_id": r, "record": data.get(rrn)})
             else:
-                for rec in data.get('matched', []) + data.get('unmatched', []):
+                for rec in chain(data.get('matched') or (), data.get('unmatched') or ()):
                     if isinstance(rec, dict) and (rec.get('rrn') == rrn or rec.get('RRN') == rrn):
-                        return JSONResponse(content={"run_id": r, "record": rec})
+                        return ORJSONResponse(content={"run_id": r, "record": rec})
 
+        _remember_not_found(not_found_key)
         raise HTTPException(status_code=404, detail="RRN not found in recent runs")
     except HTTPException:
         raise
@@ -50,6 +112,37 @@ async def enquiry(user: dict = Depends(get_current_user), rrn: str = Query(None)
         raise HTTPException(status_code=500, detail="Failed to perform enquiry")
 
 
+def _scan_recon_data(recon_data: dict, rrn: Optional[str], txn_id: Optional[str]) -> Optional[Tuple[str, dict]]:
+    """Return (section, record) for the first record matching rrn or txn_id, if any."""
+    for section in INDEXED_SECTIONS:
+        records = recon_data.get(section)
+        if not isinstance(records, list):
+            continue
+        for txn in records:
+            if isinstance(txn, dict):
+                if rrn and str(txn.get('rrn', '')) == rrn:
+                    return section, txn
+                if txn_id and str(txn.get('upi_tran_id', '')) == txn_id:
+                    return section, txn
+    return None
+
+
+def _lookup_transaction(run_path: str, mtime_ns: int, rrn: Optional[str], txn_id: Optional[str]) -> Optional[Tuple[str, dict]]:
+    """Find a record in the run's RRN index; fall back to scanning
+    recon_output.json (and rebuild the index) when it is missing or stale."""
+    output_dir = os.path.dirname(run_path)
+    conn = open_recon_index(output_dir, mtime_ns)
+    if conn is not None:
+        try:
+            return find_indexed_record(conn, rrn, txn_id)
+        finally:
+            conn.close()
+    recon_data = read_json(run_path)
+    found = _scan_recon_data(recon_data, rrn, txn_id)
+    write_recon_index(output_dir, recon_data)
+    return found
+
+
 @router.get("/chatbot")
 async def chatbot_lookup(
     rrn: Optional[str] = Query(None, description="12-digit Retrieval Reference Number"),
@@ -63,13 +156,13 @@ async def chatbot_lookup(
             txn_id = txd_id
 
         # Auto-detect: if txn_id is exactly 12 digits, treat as RRN
-        if txn_id and len(txn_id) == 12 and txn_id.isdigit():
+        if txn_id and _is_rrn(txn_id):
             rrn = txn_id
             txn_id = None
 
         # Step 1: Validate input - at least one parameter required
         if not rrn and not txn_id:
-            return JSONResponse(status_code=400, content={
+            return ORJSONResponse(status_code=400, content={
                 "error": "Missing required parameter. Provide either 'rrn' or 'txn_id'",
                 "details": {
                     "provided": {"rrn": None, "txn_id": None},
@@ -78,65 +171,34 @@ async def chatbot_lookup(
             })
 
         # Find the latest run
-        runs = [d for d in os.listdir(OUTPUT_DIR) if d.startswith('RUN_') and os.path.isdir(os.path.join(OUTPUT_DIR, d))]
+        runs = list_runs(OUTPUT_DIR)
         if not runs:
-            return JSONResponse(status_code=404, content={
+            return ORJSONResponse(status_code=404, content={
                 "error": "No reconciliation data available",
                 "message": "Please run reconciliation first",
             })
 
-        runs.sort(reverse=True)
-        latest_run = runs[0]
+        latest_run = runs[-1]
         run_path = os.path.join(OUTPUT_DIR, latest_run, 'recon_output.json')
 
-        if not os.path.exists(run_path):
-            return JSONResponse(status_code=404, content={
+        try:
+            mtime_ns = os.stat(run_path).st_mtime_ns
+        except FileNotFoundError:
+            return ORJSONResponse(status_code=404, content={
                 "error": "Reconciliation output not found",
                 "message": f"File not found: {run_path}",
             })
 
-        # Load the reconciliation data
-        with open(run_path, 'r', encoding='utf-8') as f:
-            recon_data = json.load(f)
-
-        # Search through exceptions and ttum_candidates
-        transaction = None
-        search_source = None
-
-        # Search in exceptions first
-        if 'exceptions' in recon_data and isinstance(recon_data['exceptions'], list):
-            for txn in recon_data['exceptions']:
-                if isinstance(txn, dict):
-                    txn_rrn = str(txn.get('rrn', ''))
-                    txn_upi_id = str(txn.get('upi_tran_id', ''))
-
-                    if rrn and txn_rrn == rrn:
-                        transaction = txn
-                        search_source = 'exceptions'
-                        break
-                    elif txn_id and txn_upi_id == txn_id:
-                        transaction = txn
-                        search_source = 'exceptions'
-                        break
-
-        # If not found in exceptions, search in ttum_candidates
-        if not transaction and 'ttum_candidates' in recon_data and isinstance(recon_data['ttum_candidates'], list):
-            for txn in recon_data['ttum_candidates']:
-                if isinstance(txn, dict):
-                    txn_rrn = str(txn.get('rrn', ''))
-                    txn_upi_id = str(txn.get('upi_tran_id', ''))
-
-                    if rrn and txn_rrn == rrn:
-                        transaction = txn
-                        search_source = 'ttum_candidates'
-                        break
-                    elif txn_id and txn_upi_id == txn_id:
-                        transaction = txn
-                        search_source = 'ttum_candidates'
-                        break
+        not_found_key = ('chatbot', rrn, txn_id, latest_run, mtime_ns)
+        if _recently_not_found(not_found_key):
+            found = None
+        else:
+            found = await asyncio.to_thread(_lookup_transaction, run_path, mtime_ns, rrn, txn_id)
+        search_source, transaction = found if found else (None, None)
 
         if not transaction:
-            return JSONResponse(status_code=404, content={
+            _remember_not_found(not_found_key)
+            return ORJSONResponse(status_code=404, content={
                 "error": "Transaction not found",
                 "message": f"No transaction found with the specified {'RRN' if rrn else 'Transaction ID'}",
                 "searched": {
@@ -163,11 +225,11 @@ async def chatbot_lookup(
             },
         }
 
-        return JSONResponse(content=formatted_response)
+        return ORJSONResponse(content=formatted_response)
 
     except Exception as e:
         logger.error(f"Chatbot lookup error: {e}")
-        return JSONResponse(status_code=500, content={
+        return ORJSONResponse(status_code=500, content={
             "error": "Failed to lookup transaction",
             "details": str(e),
         })
@@ -1,17 +1,19 @@
-import json
+import asyncio
 import logging
 import os
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from core.rate_limit import rate_limiter
 from core.security import get_current_user
 from dependencies import audit
+from services.json_io import read_json, read_json_cached_with, write_json
+from services.run_index import find_run_file, list_runs
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +24,24 @@ router = APIRouter(prefix="/api/v1/force-match", tags=["force-match"])
 # Maker / Checker Force-Match Flow (file-backed proposals)
 # =====================
 
+_PROPOSALS_SUFFIX = "_proposals.json"
+
+# proposal_id -> run_id of the proposals file holding it. Filled by one scan of
+# OUTPUT_DIR on first use and kept current by _save_proposals; a miss rescans,
+# since the files (possibly written by another worker) stay the source of truth.
+_PROPOSAL_RUNS: Dict[str, str] = {}
+_proposal_runs_loaded = False
+
+
 def _proposal_store_path(run_id: str):
-    return os.path.join(OUTPUT_DIR, f"{run_id}_proposals.json")
+    return os.path.join(OUTPUT_DIR, f"{run_id}{_PROPOSALS_SUFFIX}")
 
 
 def _load_proposals(run_id: str):
     ppath = _proposal_store_path(run_id)
     try:
         if os.path.exists(ppath):
-            with open(ppath, 'r') as pf:
-                return json.load(pf)
+            return read_json(ppath)
     except Exception:
         return []
     return []
@@ -40,26 +50,64 @@ def _load_proposals(run_id: str):
 def _save_proposals(run_id: str, proposals):
     ppath = _proposal_store_path(run_id)
     try:
-        with open(ppath, 'w') as pf:
-            json.dump(proposals, pf, indent=2)
-        return True
+        write_json(ppath, proposals)
     except Exception:
         return False
+    for p in proposals:
+        if isinstance(p, dict) and p.get('proposal_id'):
+            _PROPOSAL_RUNS[p['proposal_id']] = run_id
+    return True
 
 
-def _latest_run_id() -> Optional[str]:
-    runs = []
+def _index_proposals() -> None:
+    """Rebuild _PROPOSAL_RUNS from every proposals file under OUTPUT_DIR."""
+    global _proposal_runs_loaded
+    index = {}
     try:
-        runs.extend([d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')])
-    except Exception:
-        pass
-    try:
-        runs.extend([d for d in os.listdir(OUTPUT_DIR) if d.startswith('RUN_')])
-    except Exception:
-        pass
-    if not runs:
+        with os.scandir(OUTPUT_DIR) as it:
+            names = [e.name for e in it if e.name.endswith(_PROPOSALS_SUFFIX)]
+    except FileNotFoundError:
+        names = []
+    for fname in names:
+        run_id = fname[:-len(_PROPOSALS_SUFFIX)]
+        for p in _load_proposals(run_id):
+            if isinstance(p, dict) and p.get('proposal_id'):
+                index.setdefault(p['proposal_id'], run_id)
+    _PROPOSAL_RUNS.clear()
+    _PROPOSAL_RUNS.update(index)
+    _proposal_runs_loaded = True
+
+
+def _proposal_in_run(run_id: Optional[str], proposal_id: str):
+    if run_id is None:
         return None
-    return sorted(set(runs))[-1]
+    proposals = _load_proposals(run_id)
+    for i, p in enumerate(proposals):
+        if isinstance(p, dict) and p.get('proposal_id') == proposal_id:
+            return run_id, proposals, i
+    return None
+
+
+def _find_proposal(proposal_id: str):
+    """Return (run_id, proposals, index) for the file holding proposal_id, or None."""
+    scanned = not _proposal_runs_loaded
+    if scanned:
+        _index_proposals()
+    located = _proposal_in_run(_PROPOSAL_RUNS.get(proposal_id), proposal_id)
+    if located is None and not scanned:
+        _index_proposals()
+        located = _proposal_in_run(_PROPOSAL_RUNS.get(proposal_id), proposal_id)
+    return located
+
+
+def _latest_run_id() -> Optional[str]:
+    runs = []
+    for root in (UPLOAD_DIR, OUTPUT_DIR):
+        try:
+            runs.extend(list_runs(root)[-1:])
+        except OSError:
+            pass
+    return max(runs, default=None)
 
 
 def _find_recon_output_path(run_id: str) -> Optional[str]:
@@ -71,12 +119,29 @@ def _find_recon_output_path(run_id: str) -> Optional[str]:
     # Legacy fallback inside upload directory
     run_root = os.path.join(UPLOAD_DIR, run_id)
     if os.path.isdir(run_root):
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'recon_output.json' in files:
-                return os.path.join(root_dir, 'recon_output.json')
+        return find_run_file(run_root, 'recon_output.json')
     return None
 
 
+def _build_exception_index(recon_data) -> Dict[str, dict]:
+    """Return {rrn: exception} for recon_data's exceptions; the first record per RRN wins."""
+    by_rrn = {}
+    if isinstance(recon_data, dict):
+        for exc in recon_data.get('exceptions') or []:
+            if not isinstance(exc, dict):
+                continue
+            for key in ('rrn', 'RRN'):
+                rrn = exc.get(key)
+                if rrn and rrn not in by_rrn:
+                    by_rrn[rrn] = exc
+    return by_rrn
+
+
+def _exception_index(recon_path: str):
+    """Return (recon_data, {rrn: exception}), both cached with the parsed recon output."""
+    return read_json_cached_with(recon_path, 'exceptions_by_rrn', _build_exception_index)
+
+
 def _rrn_exists_in_recon(recon_data, rrn: str) -> bool:
     if not rrn:
         return False
@@ -132,35 +197,54 @@ def _apply_force_match(recon_data, rrn: str, approved_by: str, proposal_id: Opti
     return recon_data, updated
 
 
+def _force_match_file(recon_path: str, rrn: str, approved_by: str, proposal_id: Optional[str] = None) -> bool:
+    """Apply _apply_force_match to the recon output at recon_path; rewrite it only if changed."""
+    # The cached copy is shared; modify a freshly parsed one
+    recon_data = read_json(recon_path)
+    recon_data, updated = _apply_force_match(recon_data, rrn, approved_by=approved_by, proposal_id=proposal_id)
+    if updated:
+        write_json(recon_path, recon_data)
+    return updated
+
+
+def _proposals_with_details(run_id: str):
+    """Load run_id's proposals, enriched with their exception records from recon output."""
+    proposals = _load_proposals(run_id)
+    exceptions_by_rrn = {}
+    if proposals:
+        try:
+            recon_path = _find_recon_output_path(run_id)
+            if recon_path:
+                _, exceptions_by_rrn = _exception_index(recon_path)
+        except Exception:
+            pass  # If lookup fails, just return proposals as-is
+    for prop in proposals:
+        exc = exceptions_by_rrn.get(prop.get('rrn'))
+        if exc is not None:
+            prop['transaction_details'] = exc
+    return proposals
+
+
+def _rrn_in_recon_output(recon_path: str, rrn: str) -> bool:
+    recon_data, exceptions_by_rrn = _exception_index(recon_path)
+    if isinstance(recon_data, dict) and 'exceptions' in recon_data:
+        return rrn in exceptions_by_rrn or rrn in recon_data
+    return _rrn_exists_in_recon(recon_data, rrn)
+
+
 @router.get("/proposals")
 async def get_force_match_proposals(run_id: Optional[str] = None, user: dict = Depends(get_current_user)):
     """Get all force-match proposals for a run (or latest if not specified)"""
     try:
         if not run_id:
-            run_id = _latest_run_id()
+            run_id = await asyncio.to_thread(_latest_run_id)
             if not run_id:
                 raise HTTPException(status_code=404, detail="No runs found")
 
-        proposals = _load_proposals(run_id)
+        # File reads and the recon parse run off the event loop
+        proposals = await asyncio.to_thread(_proposals_with_details, run_id)
 
-        # Enrich proposals with transaction details from recon output
-        for prop in proposals:
-            prop_rrn = prop.get('rrn')
-            try:
-                # Try to get full transaction data
-                recon_path = _find_recon_output_path(run_id)
-                if recon_path:
-                    with open(recon_path, 'r') as f:
-                        recon_data = json.load(f)
-                    if isinstance(recon_data, dict) and 'exceptions' in recon_data:
-                        for exc in recon_data['exceptions']:
-                            if exc.get('rrn') == prop_rrn:
-                                prop['transaction_details'] = exc
-                                break
-            except Exception:
-                pass  # If lookup fails, just return proposal as-is
-
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "run_id": run_id,
             "proposals": proposals,
             "total": len(proposals),
@@ -204,19 +288,16 @@ async def propose_force_match(request: Request, user: dict = Depends(get_current
             raise HTTPException(status_code=400, detail='rrn and action are required')
 
         if not run_id:
-            run_id = _latest_run_id()
+            run_id = await asyncio.to_thread(_latest_run_id)
             if not run_id:
                 raise HTTPException(status_code=404, detail='No runs found')
 
         # Validate RRN exists in the reconciliation results
-        recon_path = _find_recon_output_path(run_id)
+        recon_path = await asyncio.to_thread(_find_recon_output_path, run_id)
         if not recon_path:
             raise HTTPException(status_code=404, detail=f'recon_output.json not found for run {run_id}')
 
-        with open(recon_path, 'r') as f:
-            recon_data = json.load(f)
-
-        if not _rrn_exists_in_recon(recon_data, rrn):
+        if not await asyncio.to_thread(_rrn_in_recon_output, recon_path, rrn):
             raise HTTPException(status_code=404, detail=f'RRN {rrn} not found in reconciliation results')
 
         # Legacy direct force-match flow used by frontend panel
@@ -224,23 +305,21 @@ async def propose_force_match(request: Request, user: dict = Depends(get_current
         source2 = payload.get('source2')
         if source1 and source2:
             user_id = user.get('username', 'system')
-            recon_data, updated = _apply_force_match(recon_data, rrn, approved_by=user_id, proposal_id=None)
+            updated = await asyncio.to_thread(_force_match_file, recon_path, rrn, user_id)
             if not updated:
                 raise HTTPException(status_code=404, detail=f'RRN {rrn} not found for force match update')
-            with open(recon_path, 'w') as wf:
-                json.dump(recon_data, wf, indent=2)
             try:
                 audit.log_force_match(run_id, rrn, action, user_id=user_id, status='approved')
             except Exception:
                 pass
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 'status': 'success',
                 'message': f'RRN {rrn} force matched between {source1} and {source2}',
                 'action': action,
                 'rrn': rrn
             })
 
-        proposals = _load_proposals(run_id)
+        proposals = await asyncio.to_thread(_load_proposals, run_id)
         prop_id = f"PROP_{int(time.time())}_{len(proposals)+1}"
         maker = user.get('username', 'unknown')
         proposal = {
@@ -255,7 +334,7 @@ async def propose_force_match(request: Request, user: dict = Depends(get_current
             'created_at': datetime.utcnow().isoformat(),
         }
         proposals.append(proposal)
-        _save_proposals(run_id, proposals)
+        await asyncio.to_thread(_save_proposals, run_id, proposals)
 
         # audit
         try:
@@ -263,7 +342,7 @@ async def propose_force_match(request: Request, user: dict = Depends(get_current
         except Exception:
             pass
 
-        return JSONResponse(content={'status': 'proposed', 'proposal_id': prop_id, 'rrn': rrn})
+        return ORJSONResponse(content={'status': 'proposed', 'proposal_id': prop_id, 'rrn': rrn})
     except HTTPException:
         raise
     except Exception as e:
@@ -282,25 +361,11 @@ async def approve_force_match(request: Request, user: dict = Depends(get_current
         if not proposal_id:
             raise HTTPException(status_code=400, detail='proposal_id is required')
 
-        # find proposal across runs (scan OUTPUT_DIR)
-        found = None
-        for fname in os.listdir(OUTPUT_DIR):
-            if fname.endswith('_proposals.json'):
-                path = os.path.join(OUTPUT_DIR, fname)
-                try:
-                    with open(path, 'r') as pf:
-                        proposals = json.load(pf)
-                    for p in proposals:
-                        if p.get('proposal_id') == proposal_id:
-                            found = p
-                            break
-                except Exception:
-                    continue
-            if found:
-                break
-
-        if not found:
+        located = await asyncio.to_thread(_find_proposal, proposal_id)
+        if not located:
             raise HTTPException(status_code=404, detail='Proposal not found')
+        store_run_id, proposals, prop_idx = located
+        found = proposals[prop_idx]
 
         checker = user.get('username', 'unknown')
         if checker == found.get('maker'):
@@ -313,23 +378,15 @@ async def approve_force_match(request: Request, user: dict = Depends(get_current
         found['approved_at'] = datetime.utcnow().isoformat()
 
         # persist back
-        proposals = _load_proposals(found.get('run_id'))
-        for i, p in enumerate(proposals):
-            if p.get('proposal_id') == proposal_id:
-                proposals[i] = found
-                break
-        _save_proposals(found.get('run_id'), proposals)
+        await asyncio.to_thread(_save_proposals, store_run_id, proposals)
 
         # apply change to recon_output.json (mark rrn FORCE_MATCHED)
         try:
-            recon_path = _find_recon_output_path(found.get('run_id'))
+            recon_path = await asyncio.to_thread(_find_recon_output_path, found.get('run_id'))
             if recon_path and os.path.exists(recon_path):
-                with open(recon_path, 'r') as rf:
-                    ro = json.load(rf)
-                ro, _ = _apply_force_match(ro, found.get('rrn'), approved_by=checker, proposal_id=found.get('proposal_id'))
-
-                with open(recon_path, 'w') as wf:
-                    json.dump(ro, wf, indent=2)
+                await asyncio.to_thread(
+                    _force_match_file, recon_path, found.get('rrn'), checker, found.get('proposal_id')
+                )
         except Exception as e:
             logger.warning(f"Failed to update recon_output.json: {e}")
 
@@ -339,7 +396,7 @@ async def approve_force_match(request: Request, user: dict = Depends(get_current
         except Exception:
             pass
 
-        return JSONResponse(content={'status': 'approved', 'ttum_generated': True})
+        return ORJSONResponse(content={'status': 'approved', 'ttum_generated': True})
 
     except HTTPException:
         raise
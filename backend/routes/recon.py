@@ -1,18 +1,24 @@
-import json
+import asyncio
+import heapq
 import logging
 import os
+from collections import Counter
 from datetime import datetime
 from typing import List, Optional, Tuple
 
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from pydantic import BaseModel
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from core.rate_limit import rate_limiter
 from core.security import get_current_user
 from dependencies import audit, file_handler, recon_engine, upi_recon_engine
+from services.json_io import IJSON_AVAILABLE, iter_json_items, read_json, to_jsonable, write_json
+from services.recon_index import write_recon_index
+from services.recon_summary import summarize_recon_output, write_recon_summary
+from services.run_index import find_run_file, invalidate_runs, iter_run_dirs, latest_run, resolve_run_folder
 
 logger = logging.getLogger(__name__)
 
@@ -23,29 +29,44 @@ class ReconRunRequest(BaseModel):
     run_id: Optional[str] = None  # Optional; if not provided, uses latest run
 
 
+_UPI_COLUMNS = frozenset(['UPI_Tran_ID', 'Payer_PSP', 'Payee_PSP', 'Originating_Channel'])
+_UPI_TRAN_TYPES = frozenset(['U2', 'U3'])
+# Rows of Tran_Type checked before falling back to the distinct values
+_TRAN_TYPE_SAMPLE_ROWS = 64
+
+
 def _detect_upi_reconciliation(dataframes: List[pd.DataFrame]) -> bool:
     """Detect if this is a UPI reconciliation run based on file content"""
-    upi_indicators = ['UPI_Tran_ID', 'Payer_PSP', 'Payee_PSP', 'Originating_Channel']
-
     for df in dataframes:
-        if any(col in df.columns for col in upi_indicators):
+        if not _UPI_COLUMNS.isdisjoint(df.columns):
             return True
 
-        # Check for UPI-specific values in Tran_Type
+        # Check for UPI-specific values in Tran_Type. The leading rows almost
+        # always settle it; only scan the distinct values if they don't.
         if 'Tran_Type' in df.columns:
-            tran_types = df['Tran_Type'].astype(str).str.strip().str.upper()
-            if any(tt in ['U2', 'U3'] for tt in tran_types.unique()):
+            tran_type = df['Tran_Type']
+            head_types = {str(tt).strip().upper() for tt in tran_type.head(_TRAN_TYPE_SAMPLE_ROWS)}
+            if not _UPI_TRAN_TYPES.isdisjoint(head_types):
                 return True
+            if len(tran_type) > _TRAN_TYPE_SAMPLE_ROWS:
+                tran_types = {str(tt).strip().upper() for tt in pd.unique(tran_type)}
+                if not _UPI_TRAN_TYPES.isdisjoint(tran_types):
+                    return True
 
     return False
 
 
 def _extract_upi_dataframes(dataframes: List[pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Extract CBS, Switch, NPCI, and Adjustment dataframes for UPI reconciliation"""
-    cbs_df = pd.DataFrame()
-    switch_df = pd.DataFrame()
-    npci_df = pd.DataFrame()
-    adjustment_df = pd.DataFrame()
+    # Collect frames per source and concat once at the end; concatenating
+    # inside the loop would copy every earlier frame again on each file.
+    cbs_parts: List[pd.DataFrame] = []
+    switch_parts: List[pd.DataFrame] = []
+    npci_parts: List[pd.DataFrame] = []
+    adjustment_parts: List[pd.DataFrame] = []
+
+    def is_empty(parts: List[pd.DataFrame]) -> bool:
+        return all(p.empty for p in parts)
 
     for df in dataframes:
         # Get source column - handle both Series and string values
@@ -55,21 +76,29 @@ def _extract_upi_dataframes(dataframes: List[pd.DataFrame]) -> Tuple[pd.DataFram
             source = str(source_val).upper() if source_val else ''
 
         if source == 'CBS':
-            cbs_df = pd.concat([cbs_df, df], ignore_index=True)
+            cbs_parts.append(df)
         elif source == 'SWITCH':
-            switch_df = pd.concat([switch_df, df], ignore_index=True)
+            switch_parts.append(df)
         elif source == 'NPCI':
-            npci_df = pd.concat([npci_df, df], ignore_index=True)
+            npci_parts.append(df)
         elif source == 'ADJUSTMENT' or 'Adjtype' in df.columns:
-            adjustment_df = pd.concat([adjustment_df, df], ignore_index=True)
+            adjustment_parts.append(df)
         else:
             # Fallback: place into first empty slot based on order
-            if cbs_df.empty:
-                cbs_df = df.copy()
-            elif switch_df.empty:
-                switch_df = df.copy()
-            elif npci_df.empty:
-                npci_df = df.copy()
+            if is_empty(cbs_parts):
+                cbs_parts[:] = [df.copy()]
+            elif is_empty(switch_parts):
+                switch_parts[:] = [df.copy()]
+            elif is_empty(npci_parts):
+                npci_parts[:] = [df.copy()]
+
+    def combine(parts: List[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    cbs_df = combine(cbs_parts)
+    switch_df = combine(switch_parts)
+    npci_df = combine(npci_parts)
+    adjustment_df = combine(adjustment_parts)
 
     return cbs_df, switch_df, npci_df, adjustment_df
 
@@ -85,10 +114,9 @@ async def run_reconciliation(
 
         # If run_id not provided, use the latest run
         if not run_id:
-            runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-            if not runs:
+            run_id = latest_run()
+            if not run_id:
                 raise HTTPException(status_code=404, detail="No runs found")
-            run_id = sorted(runs)[-1]  # Get latest run
             logger.info(f"Using latest run: {run_id}")
 
         run_root = os.path.join(UPLOAD_DIR, run_id)
@@ -98,16 +126,7 @@ async def run_reconciliation(
             raise HTTPException(status_code=404, detail=f"Run ID '{run_id}' not found.")
 
         # locate the folder that actually contains uploaded files (may be nested by cycle/direction)
-        run_folder = None
-        for root_dir, dirs, files in os.walk(run_root):
-            # prefer folder containing file_mapping.json or CSV files
-            if 'file_mapping.json' in files or any(f.lower().endswith('.csv') for f in files):
-                run_folder = root_dir
-                break
-
-        if not run_folder:
-            # fallback to run_root
-            run_folder = run_root
+        run_folder = resolve_run_folder(run_root)
 
         # Load dataframes for reconciliation
         dataframes = file_handler.load_files_for_recon(run_folder)
@@ -132,9 +151,11 @@ async def run_reconciliation(
             try:
                 output_run_dir = os.path.join(OUTPUT_DIR, run_id)
                 os.makedirs(output_run_dir, exist_ok=True)
+                invalidate_runs(OUTPUT_DIR)
                 recon_output_path = os.path.join(output_run_dir, "recon_output.json")
-                with open(recon_output_path, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, indent=2, default=str)
+                write_json(recon_output_path, results)
+                write_recon_summary(output_run_dir, summarize_recon_output(results))
+                write_recon_index(output_run_dir, results)
                 logger.info(f"UPI reconciliation results saved to {recon_output_path}")
 
                 # Generate CSV/XLSX reports from UPI results
@@ -186,16 +207,14 @@ async def run_reconciliation(
             "status": "completed",
         }
 
-        # Add UPI-specific details if available
+        # Add UPI-specific details if available; built from the in-memory
+        # results rather than re-reading the recon_output.json just written
         if is_upi_run:
-            output_path = os.path.join(OUTPUT_DIR, run_id, 'recon_output.json')
-            if os.path.exists(output_path):
+            if isinstance(results, dict):
                 try:
-                    with open(output_path, 'r') as f:
-                        results = json.load(f)
-
-                    # Extract comprehensive summary
-                    summary = results.get('summary', {})
+                    # Extract comprehensive summary (as plain JSON types, the
+                    # way it was persisted)
+                    summary = to_jsonable(results.get('summary', {}))
                     exceptions = results.get('exceptions', [])
                     ttum_candidates = results.get('ttum_candidates', [])
 
@@ -225,11 +244,9 @@ async def run_reconciliation(
                     }
 
                     # Add exception types summary
-                    exception_types = {}
-                    for exc in exceptions:
-                        exc_type = exc.get('exception_type', 'UNKNOWN')
-                        exception_types[exc_type] = exception_types.get(exc_type, 0) + 1
-                    summary_response["exception_types"] = exception_types
+                    summary_response["exception_types"] = dict(
+                        Counter(exc.get('exception_type', 'UNKNOWN') for exc in exceptions)
+                    )
 
                 except Exception as e:
                     logger.warning(f"Could not extract details from results: {e}")
@@ -255,7 +272,7 @@ async def run_reconciliation_for_cycle(
             raise HTTPException(status_code=404, detail=f"Run ID '{run_id}' not found.")
 
         cycle_folder = None
-        for root_dir, dirs, files in os.walk(run_root):
+        for root_dir, _ in iter_run_dirs(run_root):
             if os.path.basename(root_dir).lower() == f"cycle_{cycle_id}".lower():
                 cycle_folder = root_dir
                 break
@@ -280,9 +297,9 @@ async def run_reconciliation_for_cycle(
         # Save results under OUTPUT_DIR/<run>/cycle_<id>/recon_output.json
         output_run_dir = os.path.join(OUTPUT_DIR, run_id, f"cycle_{cycle_id}")
         os.makedirs(output_run_dir, exist_ok=True)
+        invalidate_runs(OUTPUT_DIR)
         recon_output_path = os.path.join(output_run_dir, "recon_output.json")
-        with open(recon_output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, default=str)
+        write_json(recon_output_path, results)
 
         return {
             "run_id": run_id,
@@ -298,17 +315,15 @@ async def run_reconciliation_for_cycle(
 async def get_latest_summary(user: dict = Depends(get_current_user)):
     """Get reconciliation summary for the latest run. Supports UPI (OUTPUT_DIR) and legacy (UPLOAD_DIR)."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         # UPI-first: read OUTPUT_DIR/<run>/recon_output.json and return its summary
         upi_output = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
         if os.path.exists(upi_output):
-            with open(upi_output, 'r') as f:
-                data = json.load(f)
-            return JSONResponse(content={
+            data = read_json(upi_output)
+            return ORJSONResponse(content={
                 "run_id": latest,
                 "format": "upi",
                 "summary": data.get('summary', {}),
@@ -319,20 +334,17 @@ async def get_latest_summary(user: dict = Depends(get_current_user)):
         run_root = os.path.join(UPLOAD_DIR, latest)
         summary_path = None
         report_path = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'summary.json' in files:
-                summary_path = os.path.join(root_dir, 'summary.json')
-                break
-            if 'report.txt' in files:
-                report_path = os.path.join(root_dir, 'report.txt')
-                break
+        found = find_run_file(run_root, 'summary.json', 'report.txt')
+        if found and os.path.basename(found) == 'summary.json':
+            summary_path = found
+        elif found:
+            report_path = found
 
+        # Stream the stored file as-is instead of loading and re-encoding it
         if summary_path and os.path.exists(summary_path):
-            with open(summary_path, 'r') as f:
-                return JSONResponse(content=json.load(f))
+            return FileResponse(summary_path, media_type='application/json')
         if report_path and os.path.exists(report_path):
-            with open(report_path, 'r') as f:
-                return PlainTextResponse(content=f.read())
+            return FileResponse(report_path, media_type='text/plain')
         raise HTTPException(status_code=404, detail="Summary not found for the latest run")
 
     except Exception as e:
@@ -340,24 +352,68 @@ async def get_latest_summary(user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to retrieve summary")
 
 
+def _exception_amount(exc) -> float:
+    """Sort key for exceptions: numeric amount, 0 when missing or malformed."""
+    try:
+        return float(exc.get('amount') or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+def _stream_top_exceptions(path: str, limit: int) -> Tuple[List[dict], int]:
+    """Return the `limit` largest exceptions in path and the total count.
+
+    Exceptions are parsed one at a time, so only the top-N heap is kept
+    in memory instead of the whole recon output.
+    """
+    total = 0
+
+    def counted():
+        nonlocal total
+        for exc in iter_json_items(path, 'exceptions.item'):
+            total += 1
+            yield exc
+
+    top = heapq.nlargest(limit, counted(), key=_exception_amount)
+    return top, total
+
+
 @router.get("/recon/latest/unmatched")
-async def get_latest_unmatched(user: dict = Depends(get_current_user)):
+async def get_latest_unmatched(
+    limit: Optional[int] = Query(None, ge=1, description="Return only the N largest exceptions by amount"),
+    user: dict = Depends(get_current_user),
+):
     """Get unmatched transactions for the latest run (UPI format supported)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         # First check OUTPUT_DIR (UPI results)
         recon_out = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
         if os.path.exists(recon_out):
-            with open(recon_out, 'r') as f:
-                data = json.load(f)
+            data = None
+            exceptions_list, total = [], 0
+            if limit and IJSON_AVAILABLE:
+                try:
+                    exceptions_list, total = await asyncio.to_thread(_stream_top_exceptions, recon_out, limit)
+                except ValueError:
+                    # Not strict JSON (e.g. NaN in older outputs)
+                    exceptions_list, total = [], 0
+            if not total:
+                # No streaming parser, no limit, nothing streamed (the file
+                # may still be an older layout) or not streamable; parse the
+                # whole document
+                data = await asyncio.to_thread(read_json, recon_out)
 
             # Extract unmatched from UPI format
-            if isinstance(data, dict) and 'exceptions' in data:
-                exceptions_list = data.get('exceptions', [])
+            if total or (isinstance(data, dict) and 'exceptions' in data):
+                if data is not None:
+                    exceptions_list = data.get('exceptions', [])
+                    total = len(exceptions_list)
+                    if limit:
+                        # Top-N selection is O(N log K) and skips sorting the rest
+                        exceptions_list = heapq.nlargest(limit, exceptions_list, key=_exception_amount)
 
                 # Ensure exceptions have direction field for frontend filtering
                 for exc in exceptions_list:
@@ -370,25 +426,20 @@ async def get_latest_unmatched(user: dict = Depends(get_current_user)):
                         else:
                             exc['direction'] = 'UNKNOWN'
 
-                return JSONResponse(content={
+                return ORJSONResponse(content={
                     "run_id": latest,
                     "format": "upi",
                     "unmatched": exceptions_list,
-                    "count": len(exceptions_list),
+                    "count": total,
                 })
 
         # Legacy fallback: attempt to find unmatched report in UPLOAD_DIR
         run_root = os.path.join(UPLOAD_DIR, latest)
-        unmatched_path = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'unmatched.json' in files:
-                unmatched_path = os.path.join(root_dir, 'unmatched.json')
-                break
+        unmatched_path = find_run_file(run_root, 'unmatched.json')
 
         if unmatched_path and os.path.exists(unmatched_path):
-            with open(unmatched_path, 'r') as f:
-                data = json.load(f)
-            return JSONResponse(content={
+            data = read_json(unmatched_path)
+            return ORJSONResponse(content={
                 "run_id": latest,
                 "format": "legacy",
                 "unmatched": data,
@@ -408,16 +459,14 @@ async def get_latest_unmatched(user: dict = Depends(get_current_user)):
 async def get_latest_hanging(user: dict = Depends(get_current_user)):
     """Get hanging transactions for the latest run (UPI format supported)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         # First check OUTPUT_DIR (UPI results)
         recon_out = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
         if os.path.exists(recon_out):
-            with open(recon_out, 'r') as f:
-                data = json.load(f)
+            data = read_json(recon_out)
 
             if isinstance(data, dict):
                 # Extract hanging transactions (switch breakdown)
@@ -433,7 +482,7 @@ async def get_latest_hanging(user: dict = Depends(get_current_user)):
                         if 'HANGING' in exc_type.upper():
                             hanging_exceptions.append(exc)
 
-                return JSONResponse(content={
+                return ORJSONResponse(content={
                     "run_id": latest,
                     "format": "upi",
                     "hanging_count": hanging_count,
@@ -454,10 +503,9 @@ async def get_latest_hanging(user: dict = Depends(get_current_user)):
 async def get_latest_report(user: dict = Depends(get_current_user)):
     """Get the latest reconciliation report file"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         # First check OUTPUT_DIR (for UPI results)
         output_run_path = os.path.join(OUTPUT_DIR, latest)
@@ -468,11 +516,7 @@ async def get_latest_report(user: dict = Depends(get_current_user)):
 
         # Then check UPLOAD_DIR (for legacy results)
         upload_run_path = os.path.join(UPLOAD_DIR, latest)
-        report_path = None
-        for root_dir, dirs, files in os.walk(upload_run_path):
-            if 'report.txt' in files:
-                report_path = os.path.join(root_dir, 'report.txt')
-                break
+        report_path = find_run_file(upload_run_path, 'report.txt')
 
         if report_path and os.path.exists(report_path):
             return FileResponse(report_path, media_type='text/plain', filename=f"recon_report_{latest}.txt")
@@ -491,18 +535,16 @@ async def get_latest_report(user: dict = Depends(get_current_user)):
 async def get_latest_adjustments(user: dict = Depends(get_current_user)):
     """Get adjustments for the latest run (UPI format supported)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         recon_out = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
         if os.path.exists(recon_out):
-            with open(recon_out, 'r') as f:
-                data = json.load(f)
+            data = read_json(recon_out)
 
             adjustments = data.get('adjustments', [])
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "run_id": latest,
                 "format": "upi",
                 "adjustments": adjustments,
@@ -522,10 +564,9 @@ async def get_latest_adjustments(user: dict = Depends(get_current_user)):
 async def get_latest_raw_data(user: dict = Depends(get_current_user)):
     """Get raw reconciliation data for the latest run"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
+        latest = latest_run()
+        if not latest:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
 
         # First check OUTPUT_DIR (UPI results)
         recon_out = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
@@ -533,17 +574,12 @@ async def get_latest_raw_data(user: dict = Depends(get_current_user)):
         if not os.path.exists(recon_out):
             # Then check UPLOAD_DIR (legacy results)
             run_root = os.path.join(UPLOAD_DIR, latest)
-            recon_out = None
-            for root_dir, dirs, files in os.walk(run_root):
-                if 'recon_output.json' in files:
-                    recon_out = os.path.join(root_dir, 'recon_output.json')
-                    break
+            recon_out = find_run_file(run_root, 'recon_output.json')
 
         if not recon_out or not os.path.exists(recon_out):
             raise HTTPException(status_code=404, detail="Reconciliation output not found")
 
-        with open(recon_out, 'r') as f:
-            data = json.load(f)
+        data = read_json(recon_out)
 
         # Handle UPI format (has 'summary' key)
         if isinstance(data, dict) and 'summary' in data:
@@ -629,7 +665,7 @@ async def get_latest_raw_data(user: dict = Depends(get_current_user)):
                 exceptions_dict[rrn] = transaction
 
             # Build response with summary and exceptions dict
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "run_id": latest,
                 "format": "upi",
                 "summary": summary,
@@ -638,7 +674,7 @@ async def get_latest_raw_data(user: dict = Depends(get_current_user)):
             })
 
         # Legacy format: return raw data as-is
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
 
     except HTTPException:
         raise
@@ -647,6 +683,12 @@ async def get_latest_raw_data(user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to retrieve raw data")
 
 
+def _count_data_files(folder: str) -> int:
+    """Count CSV/XLSX/TXT files directly inside folder."""
+    with os.scandir(folder) as it:
+        return sum(1 for e in it if e.name.endswith(('.csv', '.xlsx', '.txt')) and e.is_file())
+
+
 @router.get('/recon/cycles/{run_id}')
 async def get_run_cycles(run_id: str, user: dict = Depends(get_current_user)):
     """Get all cycles for a specific run"""
@@ -656,18 +698,20 @@ async def get_run_cycles(run_id: str, user: dict = Depends(get_current_user)):
         # Check in UPLOAD_DIR for cycle folders
         upload_base = os.path.join(UPLOAD_DIR, run_id)
         if os.path.exists(upload_base):
-            for entry in os.listdir(upload_base):
-                if entry.startswith('cycle_'):
+            with os.scandir(upload_base) as it:
+                dir_entries = list(it)
+            for dir_entry in dir_entries:
+                if dir_entry.name.startswith('cycle_') and dir_entry.is_dir():
+                    entry = dir_entry.name
                     cycle_id = entry.split('cycle_', 1)[1]
-                    cycle_path = os.path.join(upload_base, entry)
+                    cycle_path = dir_entry.path
 
                     # Get cycle metadata
                     metadata_path = os.path.join(cycle_path, 'metadata.json')
                     cycle_metadata = {}
                     if os.path.exists(metadata_path):
                         try:
-                            with open(metadata_path, 'r') as f:
-                                cycle_metadata = json.load(f)
+                            cycle_metadata = read_json(metadata_path)
                         except Exception:
                             pass
 
@@ -680,10 +724,10 @@ async def get_run_cycles(run_id: str, user: dict = Depends(get_current_user)):
                         'path': cycle_path,
                         'has_results': has_results,
                         'metadata': cycle_metadata,
-                        'files_count': len([f for f in os.listdir(cycle_path) if f.endswith(('.csv', '.xlsx', '.txt'))]),
+                        'files_count': _count_data_files(cycle_path),
                     })
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             'run_id': run_id,
             'cycles': cycles_info,
             'total_cycles': len(cycles_info),
@@ -703,14 +747,13 @@ async def get_cycle_summary(run_id: str, cycle_id: str, user: dict = Depends(get
         if not os.path.exists(output_path):
             raise HTTPException(status_code=404, detail=f"No results found for cycle {cycle_id}")
 
-        with open(output_path, 'r') as f:
-            results = json.load(f)
+        results = read_json(output_path)
 
         # Format response similar to main summary
         summary = results.get('summary', {})
         exceptions = results.get('exceptions', [])
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "run_id": run_id,
             "cycle_id": cycle_id,
             "status": "completed",
@@ -793,8 +836,7 @@ async def merge_cycles(run_id: str = Query(...), cycle_ids: str = Query(...), us
                 continue
 
             try:
-                with open(output_path, 'r') as f:
-                    results = json.load(f)
+                results = read_json(output_path)
 
                 summary = results.get('summary', {})
                 exceptions = results.get('exceptions', [])
@@ -823,7 +865,7 @@ async def merge_cycles(run_id: str = Query(...), cycle_ids: str = Query(...), us
                 logger.warning(f"Error processing cycle {cycle_id}: {e}")
                 continue
 
-        return JSONResponse(content=merged_summary)
+        return ORJSONResponse(content=merged_summary)
 
     except HTTPException:
         raise
@@ -874,8 +916,7 @@ async def compare_cycles(run_id: str = Query(...), cycle_ids: str = Query(...),
                 continue
 
             try:
-                with open(output_path, 'r') as f:
-                    results = json.load(f)
+                results = read_json(output_path)
 
                 summary = results.get('summary', {})
                 exceptions = results.get('exceptions', [])
@@ -925,7 +966,7 @@ async def compare_cycles(run_id: str = Query(...), cycle_ids: str = Query(...),
                 # Add to comparison data
                 comparison_data.setdefault("differences", []).append(differences)
 
-        return JSONResponse(content=comparison_data)
+        return ORJSONResponse(content=comparison_data)
 
     except HTTPException:
         raise
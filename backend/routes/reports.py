@@ -1,19 +1,34 @@
+import asyncio
+import csv
 import io
-import json
+import itertools
 import logging
 import os
+import threading
 import zipfile
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional, Tuple
 from datetime import datetime
 
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from core.security import get_current_user
 from dependencies import audit, file_handler
-from services.ttum import get_ttum_files, write_ttum_csv, write_ttum_xlsx
+from services import reporting
+from services.json_io import IJSON_AVAILABLE, iter_json_items, read_json, read_json_cached, write_json
+from services.recon_summary import read_recon_summary, summarize_recon_output, write_recon_summary
+from services.reporting import CSV_READ_WORKERS, read_csv_table, write_dataframe_csv, write_table_csv
+from services.run_index import find_run_dir, find_run_file, find_run_subdir, list_runs, resolve_run_folder
+from services.ttum import (
+    get_ttum_files,
+    stream_ttum_zip,
+    ttum_fingerprint,
+    ttum_zip_path,
+)
 from services.report_catalog import (
     resolve_run_id,
     generate_listing_report,
@@ -36,6 +51,91 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
 
+
+# /ttum/merged output format -> (row writer, media type)
+_MERGED_WRITERS = {
+    'xlsx': (reporting.write_ttum_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': (reporting.write_ttum_csv, 'text/csv'),
+}
+
+
+def _mark_downloaded(ttum_dir: str, username: str) -> None:
+    """Persist the is_downloaded flag in ttum_dir; the folder is created only if missing."""
+    meta_path = os.path.join(ttum_dir, 'download_meta.json')
+    meta = {
+        'is_downloaded': True,
+        'downloaded_at': datetime.utcnow().isoformat(),
+        'downloaded_by': username,
+    }
+    try:
+        try:
+            write_json(meta_path, meta)
+        except FileNotFoundError:
+            os.makedirs(ttum_dir, exist_ok=True)
+            write_json(meta_path, meta)
+    except Exception:
+        pass
+
+
+def _preview_lines(file_path: str, count: int = 5) -> List[str]:
+    """repr() of the first `count` stripped lines of a text file, for debug logs."""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return [repr(line.strip()) for line in itertools.islice(f, count)]
+
+
+# Prefix of the cached /ttum/merged outputs, named TTUM_MERGED_<fingerprint>.<ext>
+_MERGED_PREFIX = 'TTUM_MERGED_'
+
+
+def _is_ttum_data_file(path: str) -> bool:
+    """True for TTUM CSV/JSON data, as opposed to cached archives, temp files or the download flag."""
+    name = os.path.basename(path)
+    return (
+        name.endswith(('.csv', '.json')) and not name.startswith('.')
+        and name != 'download_meta.json' and not name.startswith(_MERGED_PREFIX)
+    )
+
+
+def _remove_stale_merged(merged_path: str) -> None:
+    """Delete TTUM_MERGED_* outputs built from older inputs than merged_path."""
+    folder = os.path.dirname(merged_path)
+    current = os.path.splitext(os.path.basename(merged_path))[0]
+    with os.scandir(folder) as it:
+        stale = [
+            e.path for e in it
+            if e.name.startswith(_MERGED_PREFIX) and os.path.splitext(e.name)[0] != current
+        ]
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _read_ttum_rows(file_path: str) -> list:
+    """Rows of a TTUM JSON (list) or CSV file; other files yield no rows."""
+    if file_path.endswith('.json'):
+        data = read_json(file_path)
+        return data if isinstance(data, list) else []
+    if file_path.endswith('.csv'):
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+    return []
+
+
+def _zip_response(dest_dir: str, stem: str, paths: List[str]) -> Response:
+    """Serve the cached archive of `paths` in dest_dir, or stream it to the client while caching it."""
+    zip_path = ttum_zip_path(dest_dir, stem, paths)
+    filename = f"{stem}.zip"
+    if os.path.exists(zip_path):
+        return FileResponse(zip_path, media_type='application/zip', filename=filename)
+    return StreamingResponse(
+        stream_ttum_zip(zip_path, paths),
+        media_type='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post("/listing")
 async def generate_listing_reports(run_id: str = Query(...), user: dict = Depends(get_current_user)):
     """Generate raw listing reports immediately after upload and before reconciliation.
@@ -46,28 +146,24 @@ async def generate_listing_reports(run_id: str = Query(...), user: dict = Depend
         if not os.path.isdir(run_root):
             raise HTTPException(status_code=404, detail=f"Run ID '{run_id}' not found")
         # locate the folder that actually contains uploaded files
-        target_folder = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'file_mapping.json' in files:
-                target_folder = root_dir
-                break
-        if not target_folder:
-            target_folder = run_root
+        target_folder = resolve_run_folder(run_root)
         # Load through existing loader to normalize content
         dataframes = file_handler.load_files_for_recon(target_folder)
         out_dir = os.path.join(OUTPUT_DIR, run_id, 'reports')
         os.makedirs(out_dir, exist_ok=True)
+        # Listings are independent files; write them concurrently off the event loop
+        paths = [os.path.join(out_dir, f"listing_{idx+1}.csv") for idx in range(len(dataframes))]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(write_dataframe_csv, df, path) for df, path in zip(dataframes, paths)),
+            return_exceptions=True,
+        )
         generated = []
-        for idx, df in enumerate(dataframes):
-            try:
-                name = f"listing_{idx+1}.csv"
-                path = os.path.join(out_dir, name)
-                df.to_csv(path, index=False, encoding='utf-8-sig')
-                generated.append(path)
-            except Exception as e:
-                logger.warning(f"Failed to write listing {idx+1}: {e}")
+        for idx, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to write listing {idx+1}: {result}")
                 continue
-        return JSONResponse(content={"status": "ok", "generated": generated, "count": len(generated)})
+            generated.append(result)
+        return ORJSONResponse(content={"status": "ok", "generated": generated, "count": len(generated)})
     except HTTPException:
         raise
     except Exception as e:
@@ -78,10 +174,10 @@ async def generate_listing_reports(run_id: str = Query(...), user: dict = Depend
 async def download_gl_statement(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download GL statement for a run"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         gl_file = find_gl_statement(target)
         if not gl_file:
@@ -106,20 +202,15 @@ async def download_gl_statement(user: dict = Depends(get_current_user), run_id:
 async def download_ttum(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Package TTUM CSVs/XLSX for a run into a ZIP and return."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Get TTUM files
         candidate_dirs = []
         out_ttum = os.path.join(OUTPUT_DIR, target, 'ttum')
-        up_ttum = None
-        run_folder = os.path.join(UPLOAD_DIR, target)
-        for root_dir, dirs, files in os.walk(run_folder):
-            if 'ttum' in dirs:
-                up_ttum = os.path.join(root_dir, 'ttum')
-                break
+        up_ttum = find_run_subdir(os.path.join(UPLOAD_DIR, target), 'ttum')
         if os.path.exists(out_ttum):
             candidate_dirs.append(out_ttum)
         if up_ttum and os.path.exists(up_ttum):
@@ -129,27 +220,19 @@ async def download_ttum(user: dict = Depends(get_current_user), run_id: Optional
             raise HTTPException(status_code=404, detail="TTUM folder not found for run")
 
         ttum_dir = candidate_dirs[0]
-        zip_path = os.path.join(ttum_dir, f"ttum_{target}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for fname in os.listdir(ttum_dir):
-                fp = os.path.join(ttum_dir, fname)
-                if os.path.isfile(fp):
-                    zf.write(fp, arcname=fname)
-
-        # Set download flag
-        try:
-            meta_path = os.path.join(out_ttum, 'download_meta.json')
-            os.makedirs(out_ttum, exist_ok=True)
-            with open(meta_path, 'w') as mf:
-                json.dump({
-                    'is_downloaded': True,
-                    'downloaded_at': datetime.utcnow().isoformat(),
-                    'downloaded_by': user.get('username', 'unknown'),
-                }, mf, indent=2)
-        except Exception:
-            pass
+        # Skip archives, temp files and the download flag so the zip (and its
+        # cache fingerprint) only covers the TTUM files themselves
+        with os.scandir(ttum_dir) as it:
+            members = sorted(
+                e.path for e in it
+                if e.is_file(follow_symlinks=False) and not e.name.startswith('.')
+                and not e.name.endswith('.zip') and e.name != 'download_meta.json'
+            )
+        response = _zip_response(ttum_dir, f"ttum_{target}", members)
 
-        return FileResponse(zip_path, media_type='application/zip', filename=os.path.basename(zip_path))
+        # Set the download flag once the response has been sent
+        response.background = BackgroundTask(_mark_downloaded, out_ttum, user.get('username', 'unknown'))
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -164,79 +247,54 @@ async def download_ttum_csv(user: dict = Depends(get_current_user), run_id: Opti
     """
     try:
         # Default to latest run
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target_run = run_id if run_id else sorted(runs)[-1]
+        target_run = run_id if run_id else runs[-1]
 
         # Get TTUM files from output directory
-        ttum_files = get_ttum_files(target_run, cycle_id, format='csv')
+        ttum_files = await asyncio.to_thread(get_ttum_files, target_run, cycle_id, format='csv')
 
         logger.info(f"TTUM CSV files found for run {target_run}: {ttum_files}")
 
         if not ttum_files:
             raise HTTPException(status_code=404, detail="No TTUM CSV files found")
 
-        # Check file existence and sizes
-        for fp in ttum_files:
-            if os.path.exists(fp):
-                size = os.path.getsize(fp)
-                logger.info(f"TTUM file exists: {fp}, size: {size} bytes")
-                # Log first few lines to verify content
+        # Per-file size/content preview is diagnostic only; skip the extra
+        # stat and reads unless debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            for fp in ttum_files:
+                try:
+                    size = os.stat(fp).st_size
+                except OSError:
+                    logger.debug("TTUM file missing: %s", fp)
+                    continue
+                logger.debug("TTUM file exists: %s, size: %s bytes", fp, size)
                 try:
-                    with open(fp, 'r', encoding='utf-8-sig') as f:
-                        lines = []
-                        for i, line in enumerate(f):
-                            if i >= 5:  # First 5 lines
-                                break
-                            lines.append(repr(line.strip()))
-                        logger.info(f"TTUM file content preview: {lines}")
+                    lines = await asyncio.to_thread(_preview_lines, fp)
+                    logger.debug("TTUM file content preview: %s", lines)
                 except Exception as e:
-                    logger.error(f"Error reading TTUM file content: {e}")
-            else:
-                logger.error(f"TTUM file missing: {fp}")
+                    logger.debug("Error reading TTUM file content: %s", e)
 
         # If only one file, return it directly
         if len(ttum_files) == 1:
             ttum_file = ttum_files[0]
             filename = os.path.basename(ttum_file)
-
-            # Mark download
-            try:
-                meta_path = os.path.join(os.path.dirname(ttum_file), 'download_meta.json')
-                with open(meta_path, 'w') as mf:
-                    json.dump({
-                        'is_downloaded': True,
-                        'downloaded_at': datetime.utcnow().isoformat(),
-                        'downloaded_by': user.get('username', 'unknown'),
-                    }, mf, indent=2)
-            except Exception:
-                pass
-
-            return FileResponse(ttum_file, media_type='text/csv', filename=filename)
+            # Set the download flag once the response has been sent
+            return FileResponse(
+                ttum_file,
+                media_type='text/csv',
+                filename=filename,
+                background=BackgroundTask(_mark_downloaded, os.path.dirname(ttum_file), user.get('username', 'unknown')),
+            )
 
         # Multiple files - zip them
-        zip_path = os.path.join(OUTPUT_DIR, target_run, f"ttum_csv_{target_run}.zip")
-        os.makedirs(os.path.dirname(zip_path), exist_ok=True)
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file_path in ttum_files:
-                zf.write(file_path, arcname=os.path.basename(file_path))
+        run_output = os.path.join(OUTPUT_DIR, target_run)
+        response = _zip_response(run_output, f"ttum_csv_{target_run}", ttum_files)
 
-        # Mark download
-        try:
-            meta_path = os.path.join(OUTPUT_DIR, target_run, 'ttum', 'download_meta.json')
-            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
-            with open(meta_path, 'w') as mf:
-                json.dump({
-                    'is_downloaded': True,
-                    'downloaded_at': datetime.utcnow().isoformat(),
-                    'downloaded_by': user.get('username', 'unknown'),
-                }, mf, indent=2)
-        except Exception:
-            pass
-
-        return FileResponse(zip_path, media_type='application/zip', filename=os.path.basename(zip_path))
+        # Set the download flag once the response has been sent
+        response.background = BackgroundTask(_mark_downloaded, os.path.join(run_output, 'ttum'), user.get('username', 'unknown'))
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -250,13 +308,13 @@ async def download_ttum_xlsx(user: dict = Depends(get_current_user), run_id: Opt
     """
     try:
         # Default to latest run
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target_run = run_id if run_id else sorted(runs)[-1]
+        target_run = run_id if run_id else runs[-1]
 
         # Get TTUM files from output directory
-        ttum_files = get_ttum_files(target_run, cycle_id, format='xlsx')
+        ttum_files = await asyncio.to_thread(get_ttum_files, target_run, cycle_id, format='xlsx')
 
         logger.info(f"TTUM XLSX files found for run {target_run}: {ttum_files}")
 
@@ -267,47 +325,21 @@ async def download_ttum_xlsx(user: dict = Depends(get_current_user), run_id: Opt
         if len(ttum_files) == 1:
             ttum_file = ttum_files[0]
             filename = os.path.basename(ttum_file)
-
-            # Mark download
-            try:
-                meta_path = os.path.join(os.path.dirname(ttum_file), 'download_meta.json')
-                with open(meta_path, 'w') as mf:
-                    json.dump({
-                        'is_downloaded': True,
-                        'downloaded_at': datetime.utcnow().isoformat(),
-                        'downloaded_by': user.get('username', 'unknown'),
-                    }, mf, indent=2)
-            except Exception:
-                pass
-
+            # Set the download flag once the response has been sent
             return FileResponse(
                 ttum_file,
                 media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
                 filename=filename,
+                background=BackgroundTask(_mark_downloaded, os.path.dirname(ttum_file), user.get('username', 'unknown')),
             )
 
         # Multiple files - zip them
-        zip_path = os.path.join(OUTPUT_DIR, target_run, f"ttum_xlsx_{target_run}.zip")
-        os.makedirs(os.path.dirname(zip_path), exist_ok=True)
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file_path in ttum_files:
-                zf.write(file_path, arcname=os.path.basename(file_path))
+        run_output = os.path.join(OUTPUT_DIR, target_run)
+        response = _zip_response(run_output, f"ttum_xlsx_{target_run}", ttum_files)
 
-        # Mark download
-        try:
-            meta_path = os.path.join(OUTPUT_DIR, target_run, 'ttum', 'download_meta.json')
-            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
-            with open(meta_path, 'w') as mf:
-                json.dump({
-                    'is_downloaded': True,
-                    'downloaded_at': datetime.utcnow().isoformat(),
-                    'downloaded_by': user.get('username', 'unknown'),
-                }, mf, indent=2)
-        except Exception:
-            pass
-
-        return FileResponse(zip_path, media_type='application/zip', filename=os.path.basename(zip_path))
+        # Set the download flag once the response has been sent
+        response.background = BackgroundTask(_mark_downloaded, os.path.join(run_output, 'ttum'), user.get('username', 'unknown'))
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -315,169 +347,257 @@ async def download_ttum_xlsx(user: dict = Depends(get_current_user), run_id: Opt
         raise HTTPException(status_code=500, detail="Failed to download TTUM XLSX files")
 
 
+def _read_ttum_rows_safe(file_path: str):
+    """_read_ttum_rows, returning the exception instead of raising it."""
+    try:
+        return _read_ttum_rows(file_path)
+    except Exception as e:
+        return e
+
+
+def _build_ttum_merged(target_run: str, ext: str) -> str:
+    """Return the path of the merged TTUM file for target_run, building it if needed.
+
+    Raises HTTPException(404) when the run has no TTUM files or data.
+    """
+    # Data files only: cached /ttum archives and in-flight temp files in
+    # the same folder would otherwise change the fingerprint on every download
+    ttum_files = [fp for fp in reporting.get_ttum_files(target_run, format='all') if _is_ttum_data_file(fp)]
+
+    if not ttum_files:
+        raise HTTPException(status_code=404, detail="No TTUM files found")
+
+    write_rows = _MERGED_WRITERS[ext][0]
+
+    # Reuse the merged file built from the same inputs, if any
+    merged_name = f"{_MERGED_PREFIX}{ttum_fingerprint(ttum_files)}"
+    merged_path = os.path.join(OUTPUT_DIR, target_run, 'ttum', f"{merged_name}.{ext}")
+    if os.path.exists(merged_path):
+        return merged_path
+
+    # All-CSV inputs are read in bulk into one Arrow table when pyarrow
+    # is installed; JSON inputs go through the row-by-row merge below
+    table = None
+    if not any(fp.endswith('.json') for fp in ttum_files):
+        table = read_csv_table([fp for fp in ttum_files if fp.endswith('.csv')])
+
+    all_rows = []
+    if table is not None:
+        if not table.num_rows:
+            raise HTTPException(status_code=404, detail="No TTUM data found")
+        # Columns keep their first-seen order across the input files
+        headers = table.column_names
+    else:
+        # Read all JSON/CSV files concurrently, then merge in file order
+        with ThreadPoolExecutor(max_workers=min(CSV_READ_WORKERS, len(ttum_files))) as pool:
+            results = list(pool.map(_read_ttum_rows_safe, ttum_files))
+        # dict as an ordered set: columns keep their first-seen order
+        all_headers = {}
+        for file_path, rows in zip(ttum_files, results):
+            if isinstance(rows, Exception):
+                logger.warning(f"Error reading TTUM file {file_path}: {rows}")
+                continue
+            all_rows.extend(rows)
+            # CSV rows all share the file's header; JSON rows may differ
+            header_rows = rows[:1] if file_path.endswith('.csv') else rows
+            for row in header_rows:
+                if isinstance(row, dict):
+                    all_headers.update(dict.fromkeys(row))
+
+        if not all_rows:
+            raise HTTPException(status_code=404, detail="No TTUM data found")
+
+        # Prepare output
+        headers = list(all_headers)
+
+    # Written under a temporary name and moved into place, so a concurrent
+    # request never serves a half-written cached file
+    tmp_name = f".{merged_name}.{os.getpid()}.{threading.get_ident()}"
+    # Both writers name the file <tmp_name>.<ext> in the run's ttum folder
+    tmp_path = os.path.join(os.path.dirname(merged_path), f"{tmp_name}.{ext}")
+    try:
+        if table is not None and ext == 'csv':
+            os.makedirs(os.path.dirname(merged_path), exist_ok=True)
+            write_table_csv(table, tmp_path)
+        else:
+            rows = table.to_pylist() if table is not None else all_rows
+            tmp_path = write_rows(target_run, None, tmp_name, headers, rows)
+        os.replace(tmp_path, merged_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _remove_stale_merged(merged_path)
+    return merged_path
+
+
 @router.get("/ttum/merged")
 async def download_ttum_merged(
     user: dict = Depends(get_current_user),
     run_id: Optional[str] = None,
-    format: str = Query('xlsx', regex='^(csv|xlsx)$'),
+    format: Literal['csv', 'xlsx'] = Query('xlsx'),
 ):
     """Download all TTUM data merged into a single file (CSV or XLSX)"""
     try:
         # Default to latest run
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target_run = run_id if run_id else sorted(runs)[-1]
+        target_run = run_id if run_id else runs[-1]
 
-        from services.reporting import get_ttum_files
-        ttum_files = get_ttum_files(target_run, format='all')
+        ext = format
+        media_type = _MERGED_WRITERS[ext][1]
+        download_name = f"TTUM_MERGED_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}"
 
-        if not ttum_files:
-            raise HTTPException(status_code=404, detail="No TTUM files found")
-
-        # Read all JSON/CSV files and merge
-        import csv as csv_module
-        all_rows = []
-        all_headers = set()
-
-        for file_path in ttum_files:
-            try:
-                if file_path.endswith('.json'):
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                        if isinstance(data, list):
-                            all_rows.extend(data)
-                            for row in data:
-                                if isinstance(row, dict):
-                                    all_headers.update(row.keys())
-                elif file_path.endswith('.csv'):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        reader = csv_module.DictReader(f)
-                        for row in reader:
-                            all_rows.append(row)
-                            all_headers.update(row.keys())
-            except Exception as e:
-                logger.warning(f"Error reading TTUM file {file_path}: {e}")
-                continue
-
-        if not all_rows:
-            raise HTTPException(status_code=404, detail="No TTUM data found")
-
-        # Prepare output
-        headers = sorted(list(all_headers))
-
-        if format.lower() == 'xlsx':
-            from services.reporting import write_ttum_xlsx
-            out_path = write_ttum_xlsx(
-                target_run,
-                None,
-                f"TTUM_MERGED_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                headers,
-                all_rows,
-            )
-            return FileResponse(
-                out_path,
-                media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                filename=os.path.basename(out_path),
-            )
-        # csv
-        from services.reporting import write_ttum_csv
-        out_path = write_ttum_csv(
-            target_run,
-            None,
-            f"TTUM_MERGED_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            headers,
-            all_rows,
-        )
-        return FileResponse(out_path, media_type='text/csv', filename=os.path.basename(out_path))
+        # Listing, fingerprinting, reading and writing all run off the event loop
+        merged_path = await asyncio.to_thread(_build_ttum_merged, target_run, ext)
+        return FileResponse(merged_path, media_type=media_type, filename=download_name)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"TTUM merged download error: {e}")
         raise HTTPException(status_code=500, detail="Failed to create merged TTUM file")
 
+
+# recon outputs at least this large have their exceptions streamed in
+# /unmatched instead of parsing (and caching) the whole document
+_STREAM_THRESHOLD = 2 * 1024 * 1024
+
+
+def _stream_exceptions(path: str) -> Tuple[List[dict], Dict]:
+    """Return (exceptions, summary) from a recon output without parsing other sections.
+
+    Exceptions come back empty when the file has none (or an older layout).
+    """
+    exceptions_list = list(iter_json_items(path, 'exceptions.item'))
+    if not exceptions_list:
+        return [], {}
+    recon_summary = read_recon_summary(os.path.dirname(path), os.stat(path).st_mtime_ns)
+    if recon_summary is not None:
+        return exceptions_list, recon_summary.get('summary', {})
+    return exceptions_list, next(iter_json_items(path, 'summary'), {})
+
+
+def _load_recon_summary(output_dir: str, output_path: str) -> Dict:
+    """Return the recon summary side-car for output_dir, rebuilding it if missing or stale."""
+    recon_summary = read_recon_summary(output_dir, os.stat(output_path).st_mtime_ns)
+    if recon_summary is None:
+        recon_summary = summarize_recon_output(read_json_cached(output_path))
+        write_recon_summary(output_dir, recon_summary)
+    return recon_summary
+
+
+# Legacy record statuses reported as unmatched
+_LEGACY_UNMATCHED_STATUSES = frozenset(('HANGING', 'PARTIAL_MATCH', 'MISMATCH', 'PARTIAL_MISMATCH'))
+
+# Legacy record source keys in priority order, with the label reported for each
+_LEGACY_SOURCES = (('cbs', 'CBS'), ('switch', 'SWITCH'), ('npci', 'NPCI'))
+
+
+def _legacy_exceptions(data: Dict) -> List[dict]:
+    """Convert a legacy RRN-keyed recon dict to the exceptions array /unmatched returns."""
+    statuses = _LEGACY_UNMATCHED_STATUSES
+    exceptions_list = []
+    append = exceptions_list.append
+    for rrn, record in data.items():
+        if not isinstance(record, dict):
+            continue
+        status = record.get('status')
+        if status not in statuses:
+            continue
+        # First source with data wins
+        for key, source in _LEGACY_SOURCES:
+            source_data = record.get(key)
+            if source_data:
+                get = source_data.get
+                append({
+                    'rrn': rrn,
+                    'amount': get('amount', 0),
+                    'date': get('date', ''),
+                    'reference': get('reference', ''),
+                    'debit_credit': get('dr_cr', ''),
+                    'exception_type': status,
+                    'source': source,
+                })
+                break
+    return exceptions_list
+
+
+# First non-blank debit_credit character -> direction
+_DIRECTIONS = {'C': 'INWARD', 'c': 'INWARD', 'D': 'OUTWARD', 'd': 'OUTWARD'}
+
+
+def _with_directions(exceptions_list: List[dict]) -> List[dict]:
+    """Return exceptions_list with 'direction' derived from debit_credit where it is missing.
+
+    Records are shared with the parsed-JSON cache, so tagged records are
+    copies and the list is only copied when at least one needs tagging.
+    """
+    out = None
+    for i, exc in enumerate(exceptions_list):
+        if 'direction' in exc or 'debit_credit' not in exc:
+            continue
+        if out is None:
+            out = list(exceptions_list)
+        dr_cr = exc['debit_credit']
+        out[i] = {**exc, 'direction': _DIRECTIONS.get(dr_cr.lstrip()[:1] if dr_cr else '', 'UNKNOWN')}
+    return exceptions_list if out is None else out
+
+
 @router.get("/unmatched")
 async def get_unmatched_report(user: dict = Depends(get_current_user)):
     """Get unmatched transactions report with proper format for frontend"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        latest = sorted(runs)[-1]
+        latest = runs[-1]
 
         # First check OUTPUT_DIR (UPI results)
         recon_out = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
         if os.path.exists(recon_out):
-            with open(recon_out, 'r') as f:
-                data = json.load(f)
+            exceptions_list = None
+            if IJSON_AVAILABLE and os.path.getsize(recon_out) >= _STREAM_THRESHOLD:
+                try:
+                    exceptions_list, summary = await asyncio.to_thread(_stream_exceptions, recon_out)
+                except ValueError:
+                    # Not strict JSON (e.g. NaN in older outputs)
+                    exceptions_list = None
+            if not exceptions_list:
+                # Small file, no streaming parser, nothing streamed or not streamable
+                data = await asyncio.to_thread(read_json_cached, recon_out)
+                exceptions_list = None
+                if isinstance(data, dict) and 'exceptions' in data:
+                    exceptions_list = data.get('exceptions', [])
+                    summary = data.get('summary', {})
 
             # Extract unmatched from UPI format
-            if isinstance(data, dict) and 'exceptions' in data:
+            if exceptions_list is not None:
                 # UPI format - return exceptions as array for easier frontend processing
-                exceptions_list = data.get('exceptions', [])
-
                 # Ensure exceptions have direction field for frontend filtering
-                for exc in exceptions_list:
-                    if 'direction' not in exc and 'debit_credit' in exc:
-                        dr_cr = exc.get('debit_credit', '').strip().upper()
-                        if dr_cr.startswith('C'):
-                            exc['direction'] = 'INWARD'
-                        elif dr_cr.startswith('D'):
-                            exc['direction'] = 'OUTWARD'
-                        else:
-                            exc['direction'] = 'UNKNOWN'
-
-                return JSONResponse(content={
+                exceptions_list = _with_directions(exceptions_list)
+
+                return ORJSONResponse(content={
                     "run_id": latest,
                     "data": exceptions_list,
                     "format": "upi_array",
-                    "summary": data.get('summary', {}),
+                    "summary": summary,
                     "total_exceptions": len(exceptions_list),
                 })
 
         # Check for legacy format (RRN keyed dict)
         run_root = os.path.join(UPLOAD_DIR, latest)
-        recon_out = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'recon_output.json' in files:
-                recon_out = os.path.join(root_dir, 'recon_output.json')
-                break
+        recon_out = await asyncio.to_thread(find_run_file, run_root, 'recon_output.json')
 
         if recon_out and os.path.exists(recon_out):
-            with open(recon_out, 'r') as f:
-                data = json.load(f)
+            data = await asyncio.to_thread(read_json_cached, recon_out)
 
             # Convert legacy RRN dict to exceptions array
-            exceptions_list = []
-            if isinstance(data, dict):
-                for rrn, record in data.items():
-                    if isinstance(record, dict) and record.get('status') in ['HANGING', 'PARTIAL_MATCH', 'MISMATCH', 'PARTIAL_MISMATCH']:
-                        # Determine source and get data
-                        source_data = None
-                        source = 'UNKNOWN'
-                        if record.get('cbs'):
-                            source_data = record['cbs']
-                            source = 'CBS'
-                        elif record.get('switch'):
-                            source_data = record['switch']
-                            source = 'SWITCH'
-                        elif record.get('npci'):
-                            source_data = record['npci']
-                            source = 'NPCI'
-
-                        if source_data:
-                            exc = {
-                                'rrn': rrn,
-                                'amount': source_data.get('amount', 0),
-                                'date': source_data.get('date', ''),
-                                'reference': source_data.get('reference', ''),
-                                'debit_credit': source_data.get('dr_cr', ''),
-                                'exception_type': record.get('status', 'UNKNOWN'),
-                                'source': source,
-                            }
-                            exceptions_list.append(exc)
-
-            return JSONResponse(content={
+            exceptions_list = _legacy_exceptions(data) if isinstance(data, dict) else []
+
+            return ORJSONResponse(content={
                 "run_id": latest,
                 "data": exceptions_list,
                 "format": "upi_array",
@@ -494,14 +614,27 @@ async def get_unmatched_report(user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to retrieve unmatched report")
 
 
+def _file_download(file_path: str) -> FileResponse:
+    """Send a report file as an attachment, streamed from disk rather than read into memory."""
+    if file_path.endswith('.xlsx'):
+        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        content_type = 'text/csv; charset=utf-8'
+    return FileResponse(file_path, media_type=content_type, filename=os.path.basename(file_path))
+
+
+# Name fragments identifying the pairwise matched CSVs in a reports folder
+_MATCHED_REPORT_KEYS = ('gl_vs_switch', 'switch_vs_npci', 'gl_vs_npci', 'gl_switch', 'switch_npci', 'gl_npci', 'matched')
+
+
 @router.get("/matched")
 async def download_matched_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Package pairwise matched CSVs into a ZIP and return. Supports OUTPUT_DIR-first (UPI) and legacy."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Prefer OUTPUT_DIR/<run>/reports
         out_reports = os.path.join(OUTPUT_DIR, target, 'reports')
@@ -511,26 +644,21 @@ async def download_matched_reports(user: dict = Depends(get_current_user), run_i
         else:
             # legacy UPLOAD_DIR fallback
             run_folder = os.path.join(UPLOAD_DIR, target)
-            for root_dir, dirs, files in os.walk(run_folder):
-                if 'reports' in dirs:
-                    reports_dir = os.path.join(root_dir, 'reports')
-                    break
+            reports_dir = await asyncio.to_thread(find_run_dir, run_folder, 'reports')
 
         if not reports_dir or not os.path.exists(reports_dir):
             raise HTTPException(status_code=404, detail="Reports directory not found for run")
 
-        matched_files = [f for f in os.listdir(reports_dir) if any(x in f.lower() for x in ('gl_vs_switch', 'switch_vs_npci', 'gl_vs_npci', 'gl_switch', 'switch_npci', 'gl_npci', 'matched')) and f.endswith('.csv')]
+        with os.scandir(reports_dir) as it:
+            matched_files = [
+                e.path for e in it
+                if e.name.endswith('.csv') and any(x in e.name.lower() for x in _MATCHED_REPORT_KEYS) and e.is_file()
+            ]
         if not matched_files:
             raise HTTPException(status_code=404, detail="No matched reports found for run")
 
-        zip_path = os.path.join(reports_dir, f"matched_reports_{target}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for fname in matched_files:
-                fp = os.path.join(reports_dir, fname)
-                if os.path.isfile(fp):
-                    zf.write(fp, arcname=fname)
-
-        return FileResponse(zip_path, media_type='application/zip', filename=os.path.basename(zip_path))
+        # Cached per input fingerprint; a miss streams while the archive is written
+        return _zip_response(reports_dir, f"matched_reports_{target}", matched_files)
     except HTTPException:
         raise
     except Exception as e:
@@ -542,10 +670,10 @@ async def download_matched_reports(user: dict = Depends(get_current_user), run_i
 async def get_available_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """List all available reports for a run"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         available_reports = {
             "json": [],
@@ -581,7 +709,7 @@ async def get_available_reports(user: dict = Depends(get_current_user), run_id:
         available_reports["json"] = sorted(list(set(available_reports["json"])) )
         available_reports["other"] = sorted(list(set(available_reports["other"])) )
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "run_id": target,
             "available_reports": available_reports,
         })
@@ -597,29 +725,26 @@ async def get_available_reports(user: dict = Depends(get_current_user), run_id:
 async def download_summary(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Return summary for a run. For UPI, derives from OUTPUT_DIR/<run>/recon_output.json."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Try UPI output first
-        output_path = os.path.join(OUTPUT_DIR, target, 'recon_output.json')
+        output_dir = os.path.join(OUTPUT_DIR, target)
+        output_path = os.path.join(output_dir, 'recon_output.json')
         if os.path.exists(output_path):
-            with open(output_path, 'r') as f:
-                data = json.load(f)
-            return JSONResponse(content={
+            # Only the summary and exception count are needed; the side-car has both
+            recon_summary = await asyncio.to_thread(_load_recon_summary, output_dir, output_path)
+            return ORJSONResponse(content={
                 "run_id": target,
-                "summary": data.get('summary', {}),
-                "exceptions_count": len(data.get('exceptions', [])),
+                "summary": recon_summary.get('summary', {}),
+                "exceptions_count": recon_summary.get('exceptions_count', 0),
             })
 
         # Legacy fallback: summary.json
         run_root = os.path.join(UPLOAD_DIR, target)
-        summary_path = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'summary.json' in files:
-                summary_path = os.path.join(root_dir, 'summary.json')
-                break
+        summary_path = await asyncio.to_thread(find_run_file, run_root, 'summary.json')
 
         if summary_path and os.path.exists(summary_path):
             return FileResponse(summary_path, media_type='application/json', filename=os.path.basename(summary_path))
@@ -636,19 +761,16 @@ async def download_summary(user: dict = Depends(get_current_user), run_id: Optio
 async def download_matched_csv(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download matched report in CSV format."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         reports_dir = os.path.join(OUTPUT_DIR, target, 'reports')
         if not os.path.exists(reports_dir):
             # legacy fallback
             run_folder = os.path.join(UPLOAD_DIR, target)
-            for root_dir, dirs, files in os.walk(run_folder):
-                if 'reports' in dirs:
-                    reports_dir = os.path.join(root_dir, 'reports')
-                    break
+            reports_dir = find_run_dir(run_folder, 'reports')
 
         if not reports_dir or not os.path.exists(reports_dir):
             raise HTTPException(status_code=404, detail="Reports directory not found for run")
@@ -757,10 +879,10 @@ async def download_report_by_key(
 async def download_report_by_type(report_type: str, run_id: Optional[str] = None, user: dict = Depends(get_current_user)):
     """Download specific report by type (legacy compatibility)."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Search in OUTPUT_DIR and UPLOAD_DIR
         candidates = []
@@ -796,19 +918,16 @@ async def download_report_by_type(report_type: str, run_id: Optional[str] = None
 async def download_unmatched_csv(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download unmatched report in CSV format."""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         reports_dir = os.path.join(OUTPUT_DIR, target, 'reports')
         if not os.path.exists(reports_dir):
             # legacy fallback
             run_folder = os.path.join(UPLOAD_DIR, target)
-            for root_dir, dirs, files in os.walk(run_folder):
-                if 'reports' in dirs:
-                    reports_dir = os.path.join(root_dir, 'reports')
-                    break
+            reports_dir = find_run_dir(run_folder, 'reports')
 
         if not reports_dir or not os.path.exists(reports_dir):
             raise HTTPException(status_code=404, detail="Reports directory not found for run")
@@ -831,10 +950,10 @@ async def download_unmatched_csv(user: dict = Depends(get_current_user), run_id:
 async def download_ageing_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download ageing reports (Unmatched_Inward_Ageing.csv and Unmatched_Outward_Ageing.csv)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Try OUTPUT_DIR first (UPI format)
         output_dir = os.path.join(OUTPUT_DIR, target, 'reports')
@@ -847,11 +966,7 @@ async def download_ageing_reports(user: dict = Depends(get_current_user), run_id
         # Try UPLOAD_DIR if not found
         if not ageing_files:
             run_folder = os.path.join(UPLOAD_DIR, target)
-            reports_dir = None
-            for root_dir, dirs, files in os.walk(run_folder):
-                if 'reports' in dirs:
-                    reports_dir = os.path.join(root_dir, 'reports')
-                    break
+            reports_dir = find_run_dir(run_folder, 'reports')
 
             if reports_dir and os.path.exists(reports_dir):
                 for f in os.listdir(reports_dir):
@@ -864,23 +979,7 @@ async def download_ageing_reports(user: dict = Depends(get_current_user), run_id
         # If single file, return it directly
         if len(ageing_files) == 1:
             file_path = ageing_files[0]
-            filename = os.path.basename(file_path)
-
-            # Read file content
-            with open(file_path, 'rb') as f:
-                content = f.read()
-
-            # Set appropriate headers
-            headers = {}
-            if filename.endswith('.xlsx'):
-                content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            else:
-                content_type = 'text/csv; charset=utf-8'
-
-            headers['Content-Type'] = content_type
-            headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-            return Response(content=content, headers=headers, media_type=content_type)
+            return _file_download(file_path)
 
         # Multiple files - zip them
         zip_path = os.path.join(OUTPUT_DIR, target, f"ageing_reports_{target}.zip")
@@ -902,10 +1001,10 @@ async def download_ageing_reports(user: dict = Depends(get_current_user), run_id
 async def download_hanging_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download hanging transaction reports (Hanging_Inward.csv and Hanging_Outward.csv)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Try OUTPUT_DIR first (UPI format)
         output_dir = os.path.join(OUTPUT_DIR, target, 'reports')
@@ -918,11 +1017,7 @@ async def download_hanging_reports(user: dict = Depends(get_current_user), run_i
         # Try UPLOAD_DIR if not found
         if not hanging_files:
             run_folder = os.path.join(UPLOAD_DIR, target)
-            reports_dir = None
-            for root_dir, dirs, files in os.walk(run_folder):
-                if 'reports' in dirs:
-                    reports_dir = os.path.join(root_dir, 'reports')
-                    break
+            reports_dir = find_run_dir(run_folder, 'reports')
 
             if reports_dir and os.path.exists(reports_dir):
                 for f in os.listdir(reports_dir):
@@ -935,23 +1030,7 @@ async def download_hanging_reports(user: dict = Depends(get_current_user), run_i
         # If single file, return it directly
         if len(hanging_files) == 1:
             file_path = hanging_files[0]
-            filename = os.path.basename(file_path)
-
-            # Read file content
-            with open(file_path, 'rb') as f:
-                content = f.read()
-
-            # Set appropriate headers
-            headers = {}
-            if filename.endswith('.xlsx'):
-                content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            else:
-                content_type = 'text/csv; charset=utf-8'
-
-            headers['Content-Type'] = content_type
-            headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-            return Response(content=content, headers=headers, media_type=content_type)
+            return _file_download(file_path)
 
         # Multiple files - zip them
         zip_path = os.path.join(OUTPUT_DIR, target, f"hanging_reports_{target}.zip")
@@ -973,10 +1052,10 @@ async def download_hanging_reports(user: dict = Depends(get_current_user), run_i
 async def download_switch_update_file(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download Switch Update File"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         # Try OUTPUT_DIR first (UPI format)
         output_dir = os.path.join(OUTPUT_DIR, target, 'reports')
@@ -984,53 +1063,17 @@ async def download_switch_update_file(user: dict = Depends(get_current_user), ru
             for f in os.listdir(output_dir):
                 if 'switch_update' in f.lower() and f.endswith('.csv'):
                     file_path = os.path.join(output_dir, f)
-                    filename = os.path.basename(file_path)
-
-                    # Read file content
-                    with open(file_path, 'rb') as file:
-                        content = file.read()
-
-                    # Set appropriate headers
-                    headers = {}
-                    if filename.endswith('.xlsx'):
-                        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    else:
-                        content_type = 'text/csv; charset=utf-8'
-
-                    headers['Content-Type'] = content_type
-                    headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-                    return Response(content=content, headers=headers, media_type=content_type)
+                    return _file_download(file_path)
 
         # Try UPLOAD_DIR
         run_folder = os.path.join(UPLOAD_DIR, target)
-        reports_dir = None
-        for root_dir, dirs, files in os.walk(run_folder):
-            if 'reports' in dirs:
-                reports_dir = os.path.join(root_dir, 'reports')
-                break
+        reports_dir = find_run_dir(run_folder, 'reports')
 
         if reports_dir and os.path.exists(reports_dir):
             for f in os.listdir(reports_dir):
                 if 'switch_update' in f.lower() and f.endswith('.csv'):
                     file_path = os.path.join(reports_dir, f)
-                    filename = os.path.basename(file_path)
-
-                    # Read file content
-                    with open(file_path, 'rb') as file:
-                        content = file.read()
-
-                    # Set appropriate headers
-                    headers = {}
-                    if filename.endswith('.xlsx'):
-                        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    else:
-                        content_type = 'text/csv; charset=utf-8'
-
-                    headers['Content-Type'] = content_type
-                    headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-                    return Response(content=content, headers=headers, media_type=content_type)
+                    return _file_download(file_path)
 
         raise HTTPException(status_code=404, detail="Switch Update File not found")
     except HTTPException:
@@ -1043,10 +1086,10 @@ async def download_switch_update_file(user: dict = Depends(get_current_user), ru
 async def download_annexure_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download Annexure IV reports"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         annexure_files = []
 
@@ -1072,23 +1115,7 @@ async def download_annexure_reports(user: dict = Depends(get_current_user), run_
         # If single file, return it directly
         if len(annexure_files) == 1:
             file_path = annexure_files[0]
-            filename = os.path.basename(file_path)
-
-            # Read file content
-            with open(file_path, 'rb') as f:
-                content = f.read()
-
-            # Set appropriate headers
-            headers = {}
-            if filename.endswith('.xlsx'):
-                content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            else:
-                content_type = 'text/csv; charset=utf-8'
-
-            headers['Content-Type'] = content_type
-            headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-            return Response(content=content, headers=headers, media_type=content_type)
+            return _file_download(file_path)
 
         # Multiple files - zip them
         zip_path = os.path.join(OUTPUT_DIR, target, f"annexure_reports_{target}.zip")
@@ -1110,10 +1137,10 @@ async def download_annexure_reports(user: dict = Depends(get_current_user), run_
 async def download_all_reports(user: dict = Depends(get_current_user), run_id: Optional[str] = None):
     """Download all generated reports in a single ZIP file"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+        runs = list_runs()
         if not runs:
             raise HTTPException(status_code=404, detail="No runs found")
-        target = run_id if run_id else sorted(runs)[-1]
+        target = run_id if run_id else runs[-1]
 
         zip_path = os.path.join(OUTPUT_DIR, target, f"all_reports_{target}.zip")
         os.makedirs(os.path.dirname(zip_path), exist_ok=True)
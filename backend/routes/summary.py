@@ -1,227 +1,364 @@
-import json
+import asyncio
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from config import OUTPUT_DIR, UPLOAD_DIR
 from core.security import get_current_user
+from services.json_io import read_json
+from services.recon_summary import read_recon_summary, summarize_recon_output, write_recon_summary
+from services.run_index import find_run_file, latest_run
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["summary"])
 
+# Serialized /summary bodies and their ETags keyed by (run_id, recon_output.json mtime_ns)
+_SUMMARY_CACHE: "OrderedDict[Tuple[str, int], Tuple[bytes, str]]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 32
+_summary_cache_lock = threading.Lock()
+
+# Short-lived memo of the latest run id so bursts of polls share one lookup
+_LATEST_RUN_TTL = 1.0  # seconds
+_latest_run_cache = {'value': None, 'expires': 0.0}
+_latest_run_lock = threading.Lock()
+
+# run_id -> monotonic expiry for runs known to have no recon output yet, so
+# polling during an in-flight run skips the legacy summary.json probe
+_NO_RECON_TTL = 2.0  # seconds
+_NO_RECON_UNTIL: Dict[str, float] = {}
+
+# Threads used to read per-run summaries for /summary/historical
+_HISTORICAL_WORKERS = 8
+
+
+def _cached_latest_run():
+    """`run_index.latest_run()`, re-resolved at most once per _LATEST_RUN_TTL."""
+    now = time.monotonic()
+    if now < _latest_run_cache['expires']:
+        return _latest_run_cache['value']
+    with _latest_run_lock:
+        now = time.monotonic()
+        if now >= _latest_run_cache['expires']:
+            _latest_run_cache['value'] = latest_run()
+            _latest_run_cache['expires'] = now + _LATEST_RUN_TTL
+        return _latest_run_cache['value']
+
+
+# Shared skeleton of the "nothing to summarize" responses
+_EMPTY_SUMMARY = {
+    "total_transactions": 0,
+    "matched": 0,
+    "unmatched": 0,
+    "adjustments": 0,
+}
+
+
+def _empty_summary(status: str, run_id=None) -> dict:
+    return {**_EMPTY_SUMMARY, "status": status, "run_id": run_id}
+
+
+def _read_json_if_exists(path: str):
+    """Parse the JSON file at path, or return None if it does not exist."""
+    try:
+        return read_json(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _load_summary_json(run_root: str):
+    """Load a legacy summary.json from run_root or one of its immediate subfolders.
+
+    Uploads are saved directly under the run folder (occasionally one level
+    down), so there is no need to walk the whole run tree. Each candidate is
+    opened directly rather than checked for existence first.
+    """
+    _join = os.path.join
+    _read = _read_json_if_exists
+    data = _read(_join(run_root, 'summary.json'))
+    if data is not None:
+        return data
+    try:
+        with os.scandir(run_root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    data = _read(_join(entry.path, 'summary.json'))
+                    if data is not None:
+                        return data
+    except FileNotFoundError:
+        pass
+    return None
+
+
+# Count fields read from recon_output's summary block, in unpack order
+_SUMMARY_KEYS = (
+    'total_cbs', 'matched_cbs', 'unmatched_cbs',
+    'total_switch', 'matched_switch', 'unmatched_switch',
+    'total_npci', 'matched_npci', 'unmatched_npci',
+    'inflow_count', 'outflow_count', 'ttum_required',
+)
+_SUMMARY_AMT_KEYS = ('inflow_amount', 'outflow_amount')
+
+
+def _build_summary(run_id: str, recon_summary: dict) -> dict:
+    """Build the /summary payload from a recon_summary.json side-car."""
+    # Transform UPI recon output to summary format
+    summary_data = recon_summary.get('summary', {})
+
+    # Read every summary field in one pass
+    g = summary_data.get
+    (total_cbs, matched_cbs, unmatched_cbs,
+     total_switch, matched_switch, unmatched_switch,
+     total_npci, matched_npci, unmatched_npci,
+     inflow_count, outflow_count, ttum_required) = [g(k, 0) for k in _SUMMARY_KEYS]
+    inflow_amount, outflow_amount = [g(k, 0.0) for k in _SUMMARY_AMT_KEYS]
+
+    total_count = total_cbs + total_switch + total_npci
+    matched_count = matched_cbs + matched_switch + matched_npci
+
+    # Calculate unmatched from summary data, not just exceptions
+    unmatched_count = unmatched_cbs + unmatched_switch + unmatched_npci
+
+    # Hanging transactions come from the switch breakdown
+    hanging_count = recon_summary.get('hanging_count', 0)
+
+    return {
+        "run_id": run_id,
+        "status": "completed",
+        "totals": {
+            "count": total_count,
+            "amount": 0,
+        },
+        "matched": {
+            "count": matched_count,
+            "amount": 0,
+        },
+        "unmatched": {
+            "count": unmatched_count,
+            "amount": 0,
+        },
+        "hanging": {
+            "count": hanging_count,
+            "amount": 0,
+        },
+        "exceptions": {
+            "count": recon_summary.get('exceptions_count', 0),
+            "amount": 0,
+        },
+        "inward": {
+            "count": inflow_count,
+            "amount": inflow_amount,
+        },
+        "outward": {
+            "count": outflow_count,
+            "amount": outflow_amount,
+        },
+        "breakdown": {
+            "cbs": {
+                "total": total_cbs,
+                "matched": matched_cbs,
+                "unmatched": unmatched_cbs,
+            },
+            "switch": {
+                "total": total_switch,
+                "matched": matched_switch,
+                "unmatched": unmatched_switch,
+                "hanging": hanging_count,
+            },
+            "npci": {
+                "total": total_npci,
+                "matched": matched_npci,
+                "unmatched": unmatched_npci,
+            },
+        },
+        "ttum_required": ttum_required,
+    }
+
+
+def _summary_payload() -> Tuple[bytes, Optional[str]]:
+    """Blocking part of /summary: directory scan, stat and JSON parse.
+
+    Returns the serialized body and, for completed runs, its ETag.
+    """
+    # Nothing has been uploaded yet (e.g. right after startup)
+    if not os.path.isdir(UPLOAD_DIR):
+        return orjson.dumps(_empty_summary("no_data")), None
+
+    latest = _cached_latest_run()
+    if latest is None:
+        return orjson.dumps(_empty_summary("no_data")), None
+
+    # First try OUTPUT_DIR for UPI reconciliation results (recon_output.json)
+    output_dir = os.path.join(OUTPUT_DIR, latest)
+    output_path = os.path.join(output_dir, 'recon_output.json')
+    try:
+        st = os.stat(output_path)
+    except FileNotFoundError:
+        st = None
+    if st is not None:
+        # recon_output.json only changes when a run is (re)written, so the
+        # serialized body can be reused until its mtime moves.
+        key = (latest, st.st_mtime_ns)
+        cached = _SUMMARY_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        # Prefer the small side-car; parse the full output only when it is
+        # missing or stale, and leave a fresh side-car behind for next time
+        recon_summary = read_recon_summary(output_dir, st.st_mtime_ns)
+        if recon_summary is None:
+            recon_summary = summarize_recon_output(read_json(output_path))
+            write_recon_summary(output_dir, recon_summary)
+
+        entry = (orjson.dumps(_build_summary(latest, recon_summary)), f'"{latest}-{st.st_mtime_ns}"')
+        with _summary_cache_lock:
+            _SUMMARY_CACHE[key] = entry
+            if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+                _SUMMARY_CACHE.popitem(last=False)
+        return entry
+
+    now = time.monotonic()
+    if _NO_RECON_UNTIL.get(latest, 0.0) > now:
+        return orjson.dumps(_empty_summary("no_reconciliation_run", latest)), None
+
+    # Fallback to UPLOAD_DIR for legacy summary.json
+    legacy_summary = _load_summary_json(os.path.join(UPLOAD_DIR, latest))
+    if legacy_summary is not None:
+        return orjson.dumps(legacy_summary), None
+
+    # Only the current run is worth remembering
+    _NO_RECON_UNTIL.clear()
+    _NO_RECON_UNTIL[latest] = now + _NO_RECON_TTL
+    return orjson.dumps(_empty_summary("no_reconciliation_run", latest)), None
+
 
 @router.get("/summary")
-async def get_summary(user: dict = Depends(get_current_user)):
+async def get_summary(request: Request, user: dict = Depends(get_current_user)):
     """Get latest reconciliation summary (alias for /api/v1/recon/latest/summary)"""
     try:
-        runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
-        if not runs:
-            return {
-                "total_transactions": 0,
-                "matched": 0,
-                "unmatched": 0,
-                "adjustments": 0,
-                "status": "no_data",
-                "run_id": None,
-            }
-        latest = sorted(runs)[-1]
-
-        # First try OUTPUT_DIR for UPI reconciliation results (recon_output.json)
-        output_path = os.path.join(OUTPUT_DIR, latest, 'recon_output.json')
-        if os.path.exists(output_path):
-            with open(output_path, 'r') as f:
-                recon_data = json.load(f)
-
-            # Transform UPI recon output to summary format
-            summary_data = recon_data.get('summary', {})
-            exceptions = recon_data.get('exceptions', [])
-            details = recon_data.get('details', {})
-
-            total_count = summary_data.get('total_cbs', 0) + summary_data.get('total_switch', 0) + summary_data.get('total_npci', 0)
-            matched_count = summary_data.get('matched_cbs', 0) + summary_data.get('matched_switch', 0) + summary_data.get('matched_npci', 0)
-
-            # Calculate unmatched from summary data, not just exceptions
-            unmatched_count = (
-                summary_data.get('unmatched_cbs', 0)
-                + summary_data.get('unmatched_switch', 0)
-                + summary_data.get('unmatched_npci', 0)
-            )
-
-            # Extract hanging transactions from switch breakdown
-            switch_breakdown = details.get('switch_breakdown', {})
-            hanging_count = switch_breakdown.get('HANGING', 0)
-
-            return {
-                "run_id": latest,
-                "status": "completed",
-                "totals": {
-                    "count": total_count,
-                    "amount": 0,
-                },
-                "matched": {
-                    "count": matched_count,
-                    "amount": 0,
-                },
-                "unmatched": {
-                    "count": unmatched_count,
-                    "amount": 0,
-                },
-                "hanging": {
-                    "count": hanging_count,
-                    "amount": 0,
-                },
-                "exceptions": {
-                    "count": len(exceptions),
-                    "amount": 0,
-                },
-                "inward": {
-                    "count": summary_data.get('inflow_count', 0),
-                    "amount": summary_data.get('inflow_amount', 0.0),
-                },
-                "outward": {
-                    "count": summary_data.get('outflow_count', 0),
-                    "amount": summary_data.get('outflow_amount', 0.0),
-                },
-                "breakdown": {
-                    "cbs": {
-                        "total": summary_data.get('total_cbs', 0),
-                        "matched": summary_data.get('matched_cbs', 0),
-                        "unmatched": summary_data.get('unmatched_cbs', 0),
-                    },
-                    "switch": {
-                        "total": summary_data.get('total_switch', 0),
-                        "matched": summary_data.get('matched_switch', 0),
-                        "unmatched": summary_data.get('unmatched_switch', 0),
-                        "hanging": hanging_count,
-                    },
-                    "npci": {
-                        "total": summary_data.get('total_npci', 0),
-                        "matched": summary_data.get('matched_npci', 0),
-                        "unmatched": summary_data.get('unmatched_npci', 0),
-                    },
-                },
-                "ttum_required": summary_data.get('ttum_required', 0),
-            }
-
-        # Fallback to UPLOAD_DIR for legacy summary.json
-        run_root = os.path.join(UPLOAD_DIR, latest)
-        summary_path = None
-        for root_dir, dirs, files in os.walk(run_root):
-            if 'summary.json' in files:
-                summary_path = os.path.join(root_dir, 'summary.json')
-                break
-
-        if summary_path and os.path.exists(summary_path):
-            with open(summary_path, 'r') as f:
-                return json.load(f)
-
-        return {
-            "total_transactions": 0,
-            "matched": 0,
-            "unmatched": 0,
-            "adjustments": 0,
-            "status": "no_reconciliation_run",
-            "run_id": latest,
-        }
+        # Disk and JSON work is blocking; keep it off the event loop
+        body, etag = await asyncio.to_thread(_summary_payload)
+        if etag is None:
+            return Response(content=body, media_type='application/json')
+        headers = {'ETag': etag}
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+    except (OSError, ValueError) as e:
+        # orjson.JSONDecodeError is a ValueError; anything else is a bug and
+        # should surface rather than be reported as an empty summary
+        logger.error("Get summary error: %s", e)
+        return _empty_summary("error")
 
-    except Exception as e:
-        logger.error(f"Get summary error: {str(e)}")
-        return {
-            "total_transactions": 0,
-            "matched": 0,
-            "unmatched": 0,
-            "adjustments": 0,
-            "status": "error",
-            "run_id": None,
-        }
+def _historical_entry(run_entry: os.DirEntry) -> Optional[dict]:
+    """Build one /summary/historical row for a run folder, or None to skip it."""
+    run_id = run_entry.name
+    run_folder = run_entry.path
+    try:
+        # Extract date from run_id (RUN_YYYYMMDD_HHMMSS)
+        date_part = run_id.split('_')[1] if len(run_id.split('_')) > 1 else ''
+        month = f"{date_part[:4]}-{date_part[4:6]}" if len(date_part) >= 6 else ''
+
+        # Try to read recon output from OUTPUT_DIR first (UPI), then UPLOAD_DIR (legacy)
+        recon_output = None
+        output_dir = os.path.join(OUTPUT_DIR, run_id)
+        output_path = os.path.join(output_dir, 'recon_output.json')
+        try:
+            output_mtime_ns = os.stat(output_path).st_mtime_ns
+        except FileNotFoundError:
+            output_mtime_ns = None
+        if output_mtime_ns is not None:
+            # Only the summary block is used below, so the side-car
+            # is enough; parse the full output only when it is stale
+            recon_output = read_recon_summary(output_dir, output_mtime_ns)
+            if recon_output is None:
+                recon_output = read_json(output_path)
+                if isinstance(recon_output, dict) and 'summary' in recon_output:
+                    write_recon_summary(output_dir, summarize_recon_output(recon_output))
+        else:
+            # Try nested in UPLOAD_DIR
+            nested_path = find_run_file(run_folder, 'recon_output.json')
+            if nested_path:
+                recon_output = read_json(nested_path)
+
+        if recon_output:
+            # Handle UPI format with 'summary' key
+            if isinstance(recon_output, dict) and 'summary' in recon_output:
+                summary_data = recon_output['summary']
+
+                # Calculate totals from individual sources (CBS, Switch, NPCI)
+                total_cbs = summary_data.get('total_cbs', 0)
+                total_switch = summary_data.get('total_switch', 0)
+                total_npci = summary_data.get('total_npci', 0)
+                all_txns = total_cbs + total_switch + total_npci
+
+                # Calculate matched transactions
+                matched_cbs = summary_data.get('matched_cbs', 0)
+                matched_switch = summary_data.get('matched_switch', 0)
+                matched_npci = summary_data.get('matched_npci', 0)
+                reconciled = matched_cbs + matched_switch + matched_npci
+
+                # Extract inflow/outflow data if available, otherwise estimate
+                inflow_count = summary_data.get('inflow_count', total_npci + total_cbs)
+                inflow_amount = summary_data.get('inflow_amount', 0.0)
+                outflow_count = summary_data.get('outflow_count', total_switch)
+                outflow_amount = summary_data.get('outflow_amount', 0.0)
+            else:
+                # Legacy format - no inflow/outflow data available
+                all_txns = len(recon_output) if isinstance(recon_output, dict) else 0
+                matched = sum(
+                    1
+                    for k, v in (
+                        recon_output.items() if isinstance(recon_output, dict) else []
+                    )
+                    if isinstance(v, dict) and v.get('status') == 'MATCHED'
+                )
+                reconciled = matched
+                inflow_count = 0
+                inflow_amount = 0.0
+                outflow_count = 0
+                outflow_amount = 0.0
+
+            if month:
+                # Calculate match rate
+                match_rate = (reconciled / all_txns * 100) if all_txns > 0 else 0
+
+                return {
+                    "month": month,
+                    "allTxns": all_txns,
+                    "reconciled": reconciled,
+                    "breaks": all_txns - reconciled,
+                    "matchRate": round(match_rate, 1),
+                    "inward": inflow_count,
+                    "outward": outflow_count,
+                }
+    except Exception as ex:
+        logger.debug(f"Could not process run {run_id}: {ex}")
+    return None
+
+
+def _historical_summaries() -> list:
+    # Note: This uses UPLOAD_DIR which might differ from file_handler.base_upload_dir
+    with os.scandir(UPLOAD_DIR) as it:
+        run_entries = [e for e in it if e.name.startswith('RUN_') and e.is_dir(follow_symlinks=False)]
+    if not run_entries:
+        return []
+    # Per-run reads are small and independent; overlap their I/O latency
+    with ThreadPoolExecutor(max_workers=min(_HISTORICAL_WORKERS, len(run_entries))) as pool:
+        return [row for row in pool.map(_historical_entry, run_entries) if row is not None]
 
 
 @router.get("/summary/historical")
 async def get_historical_summary():
     """Get all historical reconciliation summaries"""
     try:
-        historical_summaries = []
-        # Note: This uses UPLOAD_DIR which might differ from file_handler.base_upload_dir
-        for run_id in os.listdir(UPLOAD_DIR):
-            if not run_id.startswith('RUN_'):
-                continue
-            run_folder = os.path.join(UPLOAD_DIR, run_id)
-            try:
-                # Extract date from run_id (RUN_YYYYMMDD_HHMMSS)
-                date_part = run_id.split('_')[1] if len(run_id.split('_')) > 1 else ''
-                month = f"{date_part[:4]}-{date_part[4:6]}" if len(date_part) >= 6 else ''
-
-                # Try to read recon output from OUTPUT_DIR first (UPI), then UPLOAD_DIR (legacy)
-                recon_output = None
-                output_path = os.path.join(OUTPUT_DIR, run_id, 'recon_output.json')
-                if os.path.exists(output_path):
-                    with open(output_path, 'r') as f:
-                        recon_output = json.load(f)
-                else:
-                    # Try nested in UPLOAD_DIR
-                    for root_dir, dirs, files in os.walk(run_folder):
-                        if 'recon_output.json' in files:
-                            with open(os.path.join(root_dir, 'recon_output.json'), 'r') as f:
-                                recon_output = json.load(f)
-                            break
-
-                if recon_output:
-                    # Handle UPI format with 'summary' key
-                    if isinstance(recon_output, dict) and 'summary' in recon_output:
-                        summary_data = recon_output['summary']
-
-                        # Calculate totals from individual sources (CBS, Switch, NPCI)
-                        total_cbs = summary_data.get('total_cbs', 0)
-                        total_switch = summary_data.get('total_switch', 0)
-                        total_npci = summary_data.get('total_npci', 0)
-                        all_txns = total_cbs + total_switch + total_npci
-
-                        # Calculate matched transactions
-                        matched_cbs = summary_data.get('matched_cbs', 0)
-                        matched_switch = summary_data.get('matched_switch', 0)
-                        matched_npci = summary_data.get('matched_npci', 0)
-                        reconciled = matched_cbs + matched_switch + matched_npci
-
-                        # Extract inflow/outflow data if available, otherwise estimate
-                        inflow_count = summary_data.get('inflow_count', total_npci + total_cbs)
-                        inflow_amount = summary_data.get('inflow_amount', 0.0)
-                        outflow_count = summary_data.get('outflow_count', total_switch)
-                        outflow_amount = summary_data.get('outflow_amount', 0.0)
-                    else:
-                        # Legacy format - no inflow/outflow data available
-                        all_txns = len(recon_output) if isinstance(recon_output, dict) else 0
-                        matched = sum(
-                            1
-                            for k, v in (
-                                recon_output.items() if isinstance(recon_output, dict) else []
-                            )
-                            if isinstance(v, dict) and v.get('status') == 'MATCHED'
-                        )
-                        reconciled = matched
-                        inflow_count = 0
-                        inflow_amount = 0.0
-                        outflow_count = 0
-                        outflow_amount = 0.0
-
-                    if month:
-                        # Calculate match rate
-                        match_rate = (reconciled / all_txns * 100) if all_txns > 0 else 0
-
-                        historical_summaries.append({
-                            "month": month,
-                            "allTxns": all_txns,
-                            "reconciled": reconciled,
-                            "breaks": all_txns - reconciled,
-                            "matchRate": round(match_rate, 1),
-                            "inward": inflow_count,
-                            "outward": outflow_count,
-                        })
-            except Exception as ex:
-                logger.debug(f"Could not process run {run_id}: {ex}")
-                continue
-
-        return historical_summaries
+        return await asyncio.to_thread(_historical_summaries)
     except Exception as e:
         logger.error(f"Get historical summary error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve historical summaries")
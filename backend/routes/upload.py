@@ -1,8 +1,11 @@
+import asyncio
 import json
 import logging
 import os
+import shutil
+import tempfile
 from datetime import datetime, date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from fastapi.responses import JSONResponse
@@ -12,11 +15,16 @@ from core.security import get_current_user
 from dependencies import audit, file_handler, rollback_manager
 from services.file_validation import validate_file_columns
 from services.file_naming import parse_upi_filename
+from services.json_io import read_json
+from services.run_index import find_run_file, list_runs
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["upload"])
 
+# Uploads are streamed to disk in chunks of this size instead of read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def _load_requirements() -> Dict:
     cfg_path = os.path.join(os.path.dirname(__file__), "..", "config", "file_requirements.json")
@@ -34,8 +42,51 @@ def _load_run_metadata(run_id: str) -> Dict:
     meta_path = os.path.join(UPLOAD_DIR, run_id, "metadata.json")
     if not os.path.exists(meta_path):
         return {}
-    with open(meta_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_json(meta_path)
+
+
+# Filename keyword rules for the generic `files` list, checked in order.
+# Each rule is a tuple of keyword groups; every group must have at least
+# one keyword present in the lower-cased filename.
+_FILE_RULES = (
+    ((('cbs',), ('in',)), 'cbs_inward'),
+    ((('cbs',), ('out',)), 'cbs_outward'),
+    ((('switch',),), 'switch'),
+    ((('npci',), ('in',)), 'npci_inward'),
+    ((('npci',), ('out',)), 'npci_outward'),
+    ((('drc',),), 'drc'),
+    ((('ntsl', 'national'),), 'ntsl'),
+    ((('adjust', 'adj'),), 'adjustment'),
+)
+
+
+def _classify_upload(fname: str) -> Optional[str]:
+    """Return the upload field key for a lower-cased filename, or None."""
+    for groups, key in _FILE_RULES:
+        if all(any(word in fname for word in group) for group in groups):
+            return key
+    return None
+
+
+async def _stage_upload(upfile: UploadFile, staging_dir: str, max_bytes: int) -> Tuple[int, str]:
+    """Stream upfile into a temp file under staging_dir and return (size, path).
+
+    Reading stops as soon as max_bytes is exceeded, so oversized uploads are
+    never held in memory or fully written out.
+    """
+    suffix = os.path.splitext(upfile.filename or '')[1]
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=staging_dir)
+    total = 0
+    with os.fdopen(fd, 'wb') as out:
+        while True:
+            chunk = await upfile.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                break
+            out.write(chunk)
+    return total, path
 
 
 @router.post("/upload", status_code=201)
@@ -56,6 +107,7 @@ async def upload_files(
     user: dict = Depends(get_current_user),
 ):
     """Uploads the required files for a reconciliation run"""
+    staging_dir = None
     try:
         run_id = f"RUN_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
@@ -103,38 +155,15 @@ async def upload_files(
                     else:
                         optional_multi_files['npci_outward'].append(upfile)
                     assigned = True
-                if 'cbs' in fname and 'in' in fname:
-                    if required_files['cbs_inward'] is None:
-                        required_files['cbs_inward'] = upfile
-                    else:
-                        duplicate_required.append(upfile.filename)
-                    assigned = True
-                elif 'cbs' in fname and 'out' in fname:
-                    if required_files['cbs_outward'] is None:
-                        required_files['cbs_outward'] = upfile
-                    else:
-                        duplicate_required.append(upfile.filename)
-                    assigned = True
-                elif 'switch' in fname:
-                    if required_files['switch'] is None:
-                        required_files['switch'] = upfile
+                file_key = _classify_upload(fname)
+                if file_key in required_files:
+                    if required_files[file_key] is None:
+                        required_files[file_key] = upfile
                     else:
                         duplicate_required.append(upfile.filename)
                     assigned = True
-                elif 'npci' in fname and 'in' in fname:
-                    optional_multi_files['npci_inward'].append(upfile)
-                    assigned = True
-                elif 'npci' in fname and 'out' in fname:
-                    optional_multi_files['npci_outward'].append(upfile)
-                    assigned = True
-                elif 'drc' in fname:
-                    optional_multi_files['drc'].append(upfile)
-                    assigned = True
-                elif 'ntsl' in fname or 'national' in fname:
-                    optional_multi_files['ntsl'].append(upfile)
-                    assigned = True
-                elif 'adjust' in fname or 'adj' in fname:
-                    optional_multi_files['adjustment'].append(upfile)
+                elif file_key is not None:
+                    optional_multi_files[file_key].append(upfile)
                     assigned = True
 
                 if not assigned:
@@ -147,7 +176,11 @@ async def upload_files(
                     # If still unassigned, treat as optional adjustment fallback
                     optional_multi_files['adjustment'].append(upfile)
 
-        uploaded_files_content = {}
+        # Original filename -> staged temp file path / size in bytes
+        staged_files: Dict[str, str] = {}
+        staged_sizes: Dict[str, int] = {}
+        # Staged inside UPLOAD_DIR so saving is a rename, not a copy
+        staging_dir = tempfile.mkdtemp(prefix=f".{run_id}_", dir=UPLOAD_DIR)
         invalid_files = []
         validation_warnings = []
         MAX_BYTES = 100 * 1024 * 1024
@@ -241,6 +274,9 @@ async def upload_files(
                 for upfile in files_list:
                     yield key, upfile
 
+        # Stage every file first; content validation then runs for all of
+        # them concurrently in worker threads.
+        staged: List[Tuple[str, str, str, int]] = []  # (key, filename, path, size)
         for key, upfile in iter_files():
             # Optional NPCI/NTSL/Adjustment filename validation
             filename_error = validate_filename_cycle_date(key, upfile.filename)
@@ -253,7 +289,7 @@ async def upload_files(
                 continue
 
             try:
-                content = await upfile.read()
+                size, staged_path = await _stage_upload(upfile, staging_dir, MAX_BYTES)
                 # Map original filename to the field key for later processing
                 original_field_map[upfile.filename] = key
             except Exception as e:
@@ -263,7 +299,7 @@ async def upload_files(
                 })
                 continue
 
-            if not content or len(content) == 0:
+            if size == 0:
                 invalid_files.append({
                     "filename": upfile.filename,
                     "error": "file is empty",
@@ -271,28 +307,34 @@ async def upload_files(
                 })
                 continue
 
-            if len(content) > MAX_BYTES:
+            if size > MAX_BYTES:
+                # Only part of the file was read; report the declared size when known
+                size = getattr(upfile, 'size', None) or size
                 invalid_files.append({
                     "filename": upfile.filename,
-                    "error": f"file size ({len(content)/1024/1024:.1f} MB) exceeds limit (100 MB)",
+                    "error": f"file size ({size/1024/1024:.1f} MB) exceeds limit (100 MB)",
                 })
                 continue
 
+            staged.append((key, upfile.filename, staged_path, size))
+
+        async def validate_staged(key: str, filename: str, path: str) -> Dict:
             # Validate file
-            is_valid, err = file_handler.validate_file_bytes(content, upfile.filename)
+            is_valid, err = await asyncio.to_thread(file_handler.validate_file_bytes, path, filename)
             if not is_valid:
-                invalid_files.append({
-                    "filename": upfile.filename,
+                return {
+                    "valid": False,
                     "error": err,
                     "suggestion": "Please check file format and ensure it contains valid financial transaction data",
-                })
-                continue
-
+                }
             # Validate columns
-            validation_result = await validate_file_columns(content, upfile.filename, key)
+            return await validate_file_columns(path, filename, key)
+
+        results = await asyncio.gather(*(validate_staged(key, fname, path) for key, fname, path, _ in staged))
+        for (key, fname, path, size), validation_result in zip(staged, results):
             if not validation_result["valid"]:
                 invalid_files.append({
-                    "filename": upfile.filename,
+                    "filename": fname,
                     "error": validation_result["error"],
                     "missing_columns": validation_result.get("missing_columns", []),
                     "suggestion": validation_result.get("suggestion", "Please check column headers in your file"),
@@ -302,7 +344,8 @@ async def upload_files(
             if validation_result.get("warnings"):
                 validation_warnings.extend(validation_result["warnings"])
 
-            uploaded_files_content[upfile.filename] = content
+            staged_files[fname] = path
+            staged_sizes[fname] = size
 
         if invalid_files:
             for bad in invalid_files:
@@ -324,7 +367,7 @@ async def upload_files(
         per_file_cycles: Dict[str, str] = {}
         try:
             import re
-            for fname, content in list(uploaded_files_content.items()):
+            for fname, staged_path in list(staged_files.items()):
                 mapped_field = original_field_map.get(fname)
                 if mapped_field == 'ntsl':
                     # Try filename pattern: ^(Cycle\d+)_(\d{4}-\d{2}-\d{2})_(.+)$
@@ -338,7 +381,8 @@ async def upload_files(
                     if not extracted_cycle:
                         # Fallback: try to extract from file content (first few lines)
                         try:
-                            text = content.decode('utf-8', errors='ignore')
+                            with open(staged_path, 'rb') as fh:
+                                text = fh.read(64 * 1024).decode('utf-8', errors='ignore')
                             lines = text.splitlines()[:10]
                             for line in lines:
                                 rm = re.search(r'Cycle\s*[:=_-]?\s*(?:Cycle)?(\d+)', line, flags=re.IGNORECASE)
@@ -370,7 +414,7 @@ async def upload_files(
         # Save files
         uploader = uploaded_by or user.get('username') or 'AUTO'
         run_folder = file_handler.save_uploaded_files(
-            uploaded_files_content,
+            staged_files,
             run_id,
             cycle=cycle,
             direction=direction,
@@ -380,8 +424,11 @@ async def upload_files(
         )
 
         # Audit
-        for fname, content in uploaded_files_content.items():
-            audit.log_file_upload(run_id, fname, len(content), user_id='system', status='success')
+        audit.log_file_upload_batch(
+            run_id,
+            [(fname, size, 'success') for fname, size in staged_sizes.items()],
+            user_id='system',
+        )
 
         logger.info(f"Files for {run_id} uploaded successfully to {run_folder}")
 
@@ -391,6 +438,10 @@ async def upload_files(
     except Exception as e:
         logger.error(f"File upload error: {str(e)}")
         raise HTTPException(status_code=500, detail="File upload process failed")
+    finally:
+        # Saved files were moved out already; drop rejected/leftover staging files
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
 
 @router.get("/upload/metadata")
@@ -399,23 +450,18 @@ async def get_upload_metadata(run_id: Optional[str] = None):
     try:
         # If no run_id provided, use the latest run
         if not run_id:
-            runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+            runs = list_runs()
             if not runs:
                 return {
                     "run_id": None,
                     "uploaded_files": [],
                     "status": "no_runs_found",
                 }
-            run_id = sorted(runs)[-1]
+            run_id = runs[-1]
 
         # Search for metadata in nested directories
         run_folder = os.path.join(UPLOAD_DIR, run_id)
-        metadata_path = None
-
-        for root_dir, dirs, files in os.walk(run_folder):
-            if 'metadata.json' in files:
-                metadata_path = os.path.join(root_dir, 'metadata.json')
-                break
+        metadata_path = find_run_file(run_folder, 'metadata.json')
 
         if not metadata_path or not os.path.exists(metadata_path):
             logger.warning(f"Metadata not found for run {run_id}")
@@ -425,8 +471,7 @@ async def get_upload_metadata(run_id: Optional[str] = None):
                 "status": "metadata_not_found",
             }
 
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
+        metadata = read_json(metadata_path)
 
         # Extract uploaded file types from saved_files dict
         uploaded_files = []
@@ -462,14 +507,14 @@ async def get_upload_validation(run_id: Optional[str] = None):
     """Return file count and row count validations for a run."""
     try:
         if not run_id:
-            runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+            runs = list_runs()
             if not runs:
                 return {
                     "run_id": None,
                     "status": "no_runs_found",
                     "summary": [],
                 }
-            run_id = sorted(runs)[-1]
+            run_id = runs[-1]
 
         metadata = _load_run_metadata(run_id)
         files_detail = metadata.get("files_detail", {})
@@ -535,9 +580,7 @@ async def get_upload_validation(run_id: Optional[str] = None):
                 if not fpath:
                     continue
                 try:
-                    with open(fpath, "rb") as fb:
-                        content = fb.read()
-                    vr = await validate_file_columns(content, original_name, file_type)
+                    vr = await validate_file_columns(fpath, original_name, file_type)
                     if (not vr.get("valid", True)) or bool(vr.get("row_errors")):
                         data_error = True
                         break
@@ -568,14 +611,14 @@ async def get_upload_validation_detail(run_id: Optional[str] = None, key: Option
     """Return row count validation detail for a specific file key."""
     try:
         if not run_id:
-            runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith('RUN_')]
+            runs = list_runs()
             if not runs:
                 return {
                     "run_id": None,
                     "status": "no_runs_found",
                     "details": [],
                 }
-            run_id = sorted(runs)[-1]
+            run_id = runs[-1]
 
         if not key:
             raise HTTPException(status_code=400, detail="key is required")
@@ -623,9 +666,7 @@ async def get_upload_validation_detail(run_id: Optional[str] = None, key: Option
             fpath = _path_for_file(info)
             if fpath:
                 try:
-                    with open(fpath, "rb") as fb:
-                        content = fb.read()
-                    vr = await validate_file_columns(content, original_name, file_type)
+                    vr = await validate_file_columns(fpath, original_name, file_type)
                     row_errors = vr.get("row_errors", []) or []
                     validation_warnings = vr.get("warnings", []) or []
                     if not vr.get("valid", True):
@@ -23,12 +23,19 @@ formatting required by the official Annexure-IV spec.
 """
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
+import csv
+import os
 import re
-import pandas as pd
-from typing import List, Dict, Optional
-from services.reporting import write_report
+from typing import Dict, Iterator, List, Optional
+from services.reporting import open_csv_output, write_report
 from config import OUTPUT_DIR
 
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
 # Exact, fixed column order required by NPCI (do not change)
 COLUMN_ORDER = [
     'Bankadjref',
@@ -45,9 +52,68 @@ COLUMN_ORDER = [
 # Allowed Flags
 ALLOWED_FLAGS = {'DRC', 'RRC', 'Cr Adj', 'TCC', 'RET'}
 
+# Upper-cased input flag -> normalized NPCI flag (preserves 'Cr Adj' case)
+_FLAG_MAP = {'CR ADJ': 'Cr Adj', 'DRC': 'DRC', 'RRC': 'RRC', 'TCC': 'TCC', 'RET': 'RET'}
+
+# Two-decimal quantum for adjsmt
+_QUANT = Decimal('0.01')
+
 # Regex for Bankadjref: allow alphanumeric and common separators (- _ / .)
 BANKREF_RE = re.compile(r'^[A-Za-z0-9\-_.\\/]{1,100}$')
 
+# Canonical YYYY-MM-DD dates skip strptime and are only range-checked
+_VALID_DATE_FAST = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+
+# Batches at or above this size are validated column-wise with pandas
+BULK_VALIDATION_THRESHOLD = 1000
+
+# Bulk validation lists at most this many bad records in its error
+MAX_REPORTED_ERRORS = 20
+
+
+# Plain decimal amounts (sign, digits, optional fraction) take the integer fast path
+_AMOUNT_RE = re.compile(r'([+-]?)(\d*)(?:\.(\d*))?')
+
+
+def _normalize_amount(adjsmt) -> str:
+    """Return adjsmt as a two-decimal string (ROUND_HALF_UP, no commas).
+
+    Plain decimal strings are rounded with integer-cents arithmetic, which
+    is exact and matches Decimal.quantize; anything else (exponents, NaN,
+    underscores) falls back to Decimal.
+    """
+    text = str(adjsmt).strip()
+    m = _AMOUNT_RE.fullmatch(text)
+    if m and (m[2] or m[3]):
+        sign = '-' if m[1] == '-' else ''
+        frac = m[3] or ''
+        cents = int(m[2] or '0') * 100 + int((frac + '00')[:2])
+        if frac[2:3] >= '5':
+            cents += 1
+        return f'{sign}{cents // 100}.{cents % 100:02d}'
+    try:
+        dec = Decimal(text)
+        if not dec.is_finite():
+            raise ValueError(text)
+        dec = dec.quantize(_QUANT, rounding=ROUND_HALF_UP)
+    except Exception:
+        raise ValueError('adjsmt must be a numeric value')
+    return format(dec, 'f')
+
+
+def _normalize_date(text: str) -> Optional[str]:
+    """Return a stripped shtdat as YYYY-MM-DD, or None if it is not a valid date."""
+    try:
+        m = _VALID_DATE_FAST.fullmatch(text)
+        if m:
+            # Already canonical: the constructor rejects impossible dates
+            datetime(int(m[1]), int(m[2]), int(m[3]))
+            return text
+        # Strict parse
+        return datetime.strptime(text, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except Exception:
+        return None
+
 
 def _validate_and_normalize(record: Dict) -> Dict:
     """Validate one record and return normalized values.
@@ -55,95 +121,82 @@ def _validate_and_normalize(record: Dict) -> Dict:
     Raises ValueError on invalid input. Does not mutate the input dict.
     """
     out = {}
+    _str = str
+    _len = len
+    _bankref_match = BANKREF_RE.fullmatch
 
     # Bankadjref: mandatory, alphanumeric-ish, max 100 chars
     bankref = record.get('Bankadjref')
-    if not bankref or not str(bankref).strip():
+    if not bankref or not _str(bankref).strip():
         raise ValueError('Bankadjref is mandatory and must be non-empty')
-    bankref = str(bankref).strip()
-    if len(bankref) > 100 or not BANKREF_RE.match(bankref):
+    bankref = _str(bankref).strip()
+    if _len(bankref) > 100 or not _bankref_match(bankref):
         raise ValueError(f'Invalid Bankadjref "{bankref}"; max 100 chars, alphanumeric and -_/. allowed')
     out['Bankadjref'] = bankref
 
     # Flag: mandatory, must be one of allowed (preserve 'Cr Adj' case)
     flag = record.get('Flag')
-    if not flag or not str(flag).strip():
+    if not flag or not _str(flag).strip():
         raise ValueError('Flag is mandatory')
-    raw_flag = str(flag).strip()
-    upper_flag = raw_flag.upper()
-    if upper_flag == 'CR ADJ':
-        norm_flag = 'Cr Adj'
-    elif upper_flag in {'DRC', 'RRC', 'TCC', 'RET'}:
-        norm_flag = upper_flag
-    else:
+    norm_flag = _FLAG_MAP.get(_str(flag).strip().upper())
+    if norm_flag is None:
         raise ValueError(f'Flag must be one of {ALLOWED_FLAGS}, got "{flag}"')
     out['Flag'] = norm_flag
 
     # shtdat: mandatory, date YYYY-MM-DD
     shtdat = record.get('shtdat')
-    if not shtdat or not str(shtdat).strip():
+    if not shtdat or not _str(shtdat).strip():
         raise ValueError('shtdat (date) is mandatory')
-    shtdat_str = str(shtdat).strip()
-    try:
-        # Strict parse
-        dt = datetime.strptime(shtdat_str, '%Y-%m-%d')
-        out['shtdat'] = dt.strftime('%Y-%m-%d')
-    except Exception:
+    shtdat_str = _normalize_date(_str(shtdat).strip())
+    if shtdat_str is None:
         raise ValueError('shtdat must be a date in YYYY-MM-DD format')
+    out['shtdat'] = shtdat_str
 
     # adjsmt: mandatory numeric with exactly 2 decimals, no commas
     adjsmt = record.get('adjsmt')
-    if adjsmt is None or str(adjsmt).strip() == '':
+    if adjsmt is None or _str(adjsmt).strip() == '':
         raise ValueError('adjsmt (amount) is mandatory')
-    # Accept strings or numbers; normalize using Decimal
-    try:
-        dec = Decimal(str(adjsmt)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    except Exception:
-        raise ValueError('adjsmt must be a numeric value')
-    # Ensure formatting with exactly two decimals and no commas
-    if dec.as_tuple().exponent != -2:
-        # Convert to two-decimal string
-        dec = dec.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    out['adjsmt'] = format(dec, 'f')
+    # Accept strings or numbers; quantize always yields exponent -2
+    out['adjsmt'] = _normalize_amount(adjsmt)
 
     # Shser: RRN, mandatory, max 50 chars
     shser = record.get('Shser')
-    if not shser or not str(shser).strip():
+    if not shser or not _str(shser).strip():
         raise ValueError('Shser (RRN) is mandatory')
-    shser = str(shser).strip()
-    if len(shser) > 50:
+    shser = _str(shser).strip()
+    if _len(shser) > 50:
         raise ValueError('Shser (RRN) exceeds max length 50')
     out['Shser'] = shser
 
     # Shcrd: NBIN + identifier (Mobile/Account/Aadhaar), mandatory, max 53 chars
     shcrd = record.get('Shcrd')
-    if not shcrd or not str(shcrd).strip():
+    if not shcrd or not _str(shcrd).strip():
         raise ValueError('Shcrd is mandatory')
-    shcrd = str(shcrd).strip()
-    if len(shcrd) > 53:
+    shcrd = _str(shcrd).strip()
+    if _len(shcrd) > 53:
         raise ValueError('Shcrd exceeds max length 53')
     out['Shcrd'] = shcrd
 
     # FileName: mandatory, max 50 chars
     fname = record.get('FileName')
-    if not fname or not str(fname).strip():
+    if not fname or not _str(fname).strip():
         raise ValueError('FileName is mandatory')
-    fname = str(fname).strip()
-    if len(fname) > 50:
+    fname = _str(fname).strip()
+    if _len(fname) > 50:
         raise ValueError('FileName exceeds max length 50')
     out['FileName'] = fname
 
     # reason: optional (NPCI reason code), if present max 5 chars
     reason = record.get('reason') or ''
-    reason = str(reason).strip()
-    if len(reason) > 5:
+    reason = _str(reason).strip()
+    if _len(reason) > 5:
         reason = reason[:5]  # Truncate to prevent NPCI upload rejection
     out['reason'] = reason
 
     # specifyother: optional bank remarks, max 400 chars
     spec = record.get('specifyother') or ''
-    spec = str(spec).strip()
-    if len(spec) > 400:
+    spec = _str(spec).strip()
+    if _len(spec) > 400:
         spec = spec[:400]  # Truncate to prevent NPCI upload rejection
     out['specifyother'] = spec
 
@@ -155,6 +208,123 @@ def _validate_and_normalize(record: Dict) -> Dict:
     return out
 
 
+def _clean_column(col):
+    """Column-wise equivalent of ``str(value or '').strip()`` (NaN becomes 'nan')."""
+    return col.where(col.astype(bool), '').astype(str).str.strip()
+
+
+def _validate_and_normalize_bulk(records: List[Dict]) -> Iterator[Dict]:
+    """Vectorized counterpart of `_validate_and_normalize` for a whole batch.
+
+    Applies the same rules column-wise (plus the Bankadjref uniqueness check)
+    and raises a single ValueError listing the invalid records, each with the
+    message `_iter_normalized` would give it.
+    Returns a generator of row dicts so the writer never needs a full list.
+    """
+    # Built per column so absent keys stay None, as with record.get()
+    df = pd.DataFrame({col: pd.Series([r.get(col) for r in records], dtype=object) for col in COLUMN_ORDER})
+    errors: Dict[int, str] = {}
+
+    def _reject(mask, msg):
+        for i in mask[mask].index:
+            i = int(i)
+            if i not in errors:
+                errors[i] = f'Record index {i} invalid: {msg(i) if callable(msg) else msg}'
+
+    bankref = _clean_column(df['Bankadjref'])
+    _reject(bankref == '', 'Bankadjref is mandatory and must be non-empty')
+    _reject(~bankref.str.fullmatch(BANKREF_RE.pattern),
+            lambda i: f'Invalid Bankadjref "{bankref[i]}"; max 100 chars, alphanumeric and -_/. allowed')
+
+    raw_flag = _clean_column(df['Flag'])
+    flag = raw_flag.str.upper().map(_FLAG_MAP)
+    _reject(raw_flag == '', 'Flag is mandatory')
+    _reject(flag.isna(), lambda i: f'Flag must be one of {ALLOWED_FLAGS}, got "{df["Flag"][i]}"')
+
+    # Settlement dates repeat heavily, so parse each distinct value once
+    shtdat = _clean_column(df['shtdat'])
+    dates = shtdat.map({value: _normalize_date(value) for value in shtdat.unique()})
+    _reject(shtdat == '', 'shtdat (date) is mandatory')
+    _reject(dates.isna(), 'shtdat must be a date in YYYY-MM-DD format')
+
+    # adjsmt keeps exact Decimal ROUND_HALF_UP semantics; NaN is not
+    # missing here, it fails the numeric check as it does per record.
+    amount_raw = df['adjsmt']
+    _reject(amount_raw.map(lambda v: v is None or str(v).strip() == ''), 'adjsmt (amount) is mandatory')
+
+    def _amount_or_none(value):
+        try:
+            return _normalize_amount(value)
+        except ValueError:
+            return None
+
+    amount = amount_raw.map(_amount_or_none)
+    _reject(amount.isna(), 'adjsmt must be a numeric value')
+
+    shser = _clean_column(df['Shser'])
+    _reject(shser == '', 'Shser (RRN) is mandatory')
+    _reject(shser.str.len() > 50, 'Shser (RRN) exceeds max length 50')
+
+    shcrd = _clean_column(df['Shcrd'])
+    _reject(shcrd == '', 'Shcrd is mandatory')
+    _reject(shcrd.str.len() > 53, 'Shcrd exceeds max length 53')
+
+    fname = _clean_column(df['FileName'])
+    _reject(fname == '', 'FileName is mandatory')
+    _reject(fname.str.len() > 50, 'FileName exceeds max length 50')
+
+    reason = _clean_column(df['reason']).str.slice(0, 5)
+    spec = _clean_column(df['specifyother']).str.slice(0, 400)
+    _reject((df['Flag'] == 'RET') & (reason == ''), 'RET flag requires a reason code')
+
+    # Only otherwise-valid rows reach this check, as in the per-record loop
+    duplicated = bankref.duplicated()
+    for i in duplicated[duplicated].index:
+        errors.setdefault(int(i), f'Duplicate Bankadjref detected: {bankref[i]}')
+
+    if errors:
+        bad = sorted(errors)
+        details = '; '.join(errors[i] for i in bad[:MAX_REPORTED_ERRORS])
+        if len(bad) > MAX_REPORTED_ERRORS:
+            details += f'; ... and {len(bad) - MAX_REPORTED_ERRORS} more'
+        raise ValueError(f'{len(bad)} invalid record(s): {details}')
+
+    out = pd.DataFrame({
+        'Bankadjref': bankref,
+        'Flag': flag,
+        'shtdat': dates,
+        'adjsmt': amount,
+        'Shser': shser,
+        'Shcrd': shcrd,
+        'FileName': fname,
+        'reason': reason,
+        'specifyother': spec,
+    }, columns=COLUMN_ORDER)
+    return (dict(zip(COLUMN_ORDER, row)) for row in out.itertuples(index=False, name=None))
+
+
+def _iter_normalized(records: List[Dict]):
+    """Yield validated rows one at a time, enforcing Bankadjref uniqueness.
+
+    Only the set of seen Bankadjref values is kept in memory.
+    """
+    seen_bankrefs = set()
+    seen_add = seen_bankrefs.add
+    validate = _validate_and_normalize
+    for i, rec in enumerate(records):
+        try:
+            row = validate(rec)
+        except Exception as e:
+            raise ValueError(f'Record index {i} invalid: {e}')
+
+        # Uniqueness check for Bankadjref (fails on the first repeat)
+        br = row['Bankadjref']
+        if br in seen_bankrefs:
+            raise ValueError(f'Duplicate Bankadjref detected: {br}')
+        seen_add(br)
+        yield row
+
+
 def generate_annexure_iv_csv(records: List[Dict], output_path: Optional[str] = None, run_id: Optional[str] = None, cycle_id: Optional[str] = None):
     """Generate Annexure-IV CSV.
 
@@ -165,24 +335,19 @@ def generate_annexure_iv_csv(records: List[Dict], output_path: Optional[str] = N
 
     Backwards-compatible: if `output_path` provided and `run_id` is None,
     writes directly to `output_path` (legacy behaviour).
+
+    Small batches are validated lazily while being written, so rows are
+    never all held in memory; a validation error removes the partial file.
     """
     if not isinstance(records, list):
         raise ValueError('records must be a list of dictionaries')
+    if not run_id and not output_path:
+        raise ValueError('Either run_id or output_path must be provided')
 
-    normalized = []
-    seen_bankrefs = set()
-    for i, rec in enumerate(records):
-        try:
-            row = _validate_and_normalize(rec)
-        except Exception as e:
-            raise ValueError(f'Record index {i} invalid: {e}')
-
-        # Uniqueness check for Bankadjref
-        br = row['Bankadjref']
-        if br in seen_bankrefs:
-            raise ValueError(f'Duplicate Bankadjref detected: {br}')
-        seen_bankrefs.add(br)
-        normalized.append(row)
+    if PANDAS_AVAILABLE and len(records) >= BULK_VALIDATION_THRESHOLD:
+        normalized = _validate_and_normalize_bulk(records)
+    else:
+        normalized = _iter_normalized(records)
 
     # If run_id provided, use standardized reporting write
     if run_id:
@@ -191,19 +356,24 @@ def generate_annexure_iv_csv(records: List[Dict], output_path: Optional[str] = N
         out = write_report(run_id, cycle_id, 'annexure', filename, COLUMN_ORDER, normalized)
         return out
 
-    # Fallback legacy write to provided output_path
-    if not output_path:
-        raise ValueError('Either run_id or output_path must be provided')
-
-    # Build DataFrame using exact column order
-    df = pd.DataFrame(normalized, columns=COLUMN_ORDER)
-
     # Ensure file directory exists
-    import os
     os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
 
-    # Write CSV: UTF-8 (no BOM), comma-separated, no index
-    df.to_csv(output_path, index=False, encoding='utf-8')
+    # Write CSV: UTF-8 (no BOM), comma-separated, exact column order.
+    # Rows are already normalized strings, so csv.DictWriter avoids the
+    # DataFrame round-trip entirely.
+    try:
+        with open_csv_output(output_path) as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMN_ORDER, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(normalized)
+    except Exception:
+        # Do not leave a truncated Annexure-IV behind
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        raise
 
 
 if __name__ == '__main__':
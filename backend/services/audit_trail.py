@@ -168,16 +168,38 @@ class AuditTrail:
         )
         
         self.entries.append(entry)
-        self._save_entry(entry)
-        
-        # Log to application logger as well
-        log_method = getattr(logger, level.value.lower(), logger.info)
-        log_method(f"[{entry.audit_id}] {action.value} - Run: {run_id}, User: {entry.user_id}")
+        self._save_entries([entry])
+        self._log_entry(entry)
         
         return entry
     
-    def _save_entry(self, entry: AuditEntry):
-        """Save an audit entry to file"""
+    def log_actions(self, entries: List[AuditEntry]) -> List[AuditEntry]:
+        """
+        Log several prepared entries with a single audit file write
+        
+        Args:
+            entries: Audit entries to record, in order
+        
+        Returns:
+            The entries that were logged
+        """
+        if not entries:
+            return entries
+        
+        self.entries.extend(entries)
+        self._save_entries(entries)
+        for entry in entries:
+            self._log_entry(entry)
+        
+        return entries
+    
+    def _log_entry(self, entry: AuditEntry):
+        """Log an audit entry to the application logger as well"""
+        log_method = getattr(logger, entry.level.value.lower(), logger.info)
+        log_method(f"[{entry.audit_id}] {entry.action.value} - Run: {entry.run_id}, User: {entry.user_id}")
+    
+    def _save_entries(self, entries: List[AuditEntry]):
+        """Save audit entries to file in one read-modify-write"""
         try:
             # Ensure audit log directory exists
             os.makedirs(self.audit_log_dir, exist_ok=True)
@@ -195,19 +217,20 @@ class AuditTrail:
                 except json.JSONDecodeError:
                     entries_data = []
             
-            # Add new entry
-            entries_data.append(entry.to_dict())
+            # Add new entries
+            new_data = [entry.to_dict() for entry in entries]
+            entries_data.extend(new_data)
             
             # Rotate if too large
             if len(entries_data) > self.max_entries_per_file:
                 self._rotate_audit_log(filepath, entries_data)
-                entries_data = [entry.to_dict()]  # Start fresh
+                entries_data = new_data  # Start fresh
             
             # Save
             with open(filepath, 'w') as f:
                 json.dump(entries_data, f, indent=2)
         except Exception as e:
-            logger.error(f"Error saving audit entry: {e}")
+            logger.error(f"Error saving audit entries: {e}")
     
     def _rotate_audit_log(self, filepath: str, entries: List[Dict]):
         """Rotate audit log when it exceeds max entries"""
@@ -288,6 +311,34 @@ class AuditTrail:
             }
         )
     
+    def log_file_upload_batch(
+        self,
+        run_id: str,
+        files: List[tuple],
+        user_id: Optional[str] = None
+    ):
+        """
+        Log several file uploads as one audit write
+        
+        Args:
+            run_id: Associated run ID
+            files: (filename, file_size, status) tuples
+            user_id: User performing the upload
+        """
+        return self.log_actions([
+            AuditEntry(
+                action=AuditAction.FILE_UPLOADED,
+                run_id=run_id,
+                user_id=user_id,
+                details={
+                    "filename": filename,
+                    "file_size": file_size,
+                    "status": status
+                }
+            )
+            for filename, file_size, status in files
+        ])
+    
     def log_reconciliation_event(
         self,
         run_id: str,
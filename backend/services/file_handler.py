@@ -1,24 +1,61 @@
 import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List
-from config import UPLOAD_DIR, OUTPUT_DIR, RUN_ID_FORMAT
+from typing import Dict, List, Union
+from config import FAST_IO, UPLOAD_DIR, OUTPUT_DIR, RUN_ID_FORMAT
 from services.logging_config import get_logger
 from services.file_naming import parse_upi_filename
+from services.run_index import invalidate_runs, record_latest_run
 
 logger = get_logger(__name__)
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# pd.read_csv's default na_values, so the Arrow reader nulls the same cells
+_PANDAS_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null',
+]
+
+def _read_csv_arrow(filepath: str) -> pd.DataFrame:
+    """Read a CSV with pyarrow's multithreaded reader into a pandas DataFrame.
+
+    Kept close to pd.read_csv output: date/time-looking columns stay as text
+    (pyarrow would otherwise infer temporal types) and missing strings are NaN.
+    """
+    convert = pa_csv.ConvertOptions(null_values=_PANDAS_NA_VALUES, strings_can_be_null=True)
+    table = pa_csv.read_csv(filepath, convert_options=convert)
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        # Original text is gone once parsed, so re-read with those columns as strings
+        convert.column_types = {name: pa.string() for name in temporal}
+        table = pa_csv.read_csv(filepath, convert_options=convert)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    return df.where(df.notna(), np.nan)
+
 class FileHandler:
     def __init__(self):
         os.makedirs(UPLOAD_DIR, exist_ok=True)
         os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    def save_uploaded_files(self, files: Dict, run_id: str, cycle: str = None, direction: str = None, run_date: str = None, per_file_cycles: Dict[str, str] = None, uploaded_by: str = "AUTO") -> str:
+    def save_uploaded_files(self, files: Dict[str, str], run_id: str, cycle: str = None, direction: str = None, run_date: str = None, per_file_cycles: Dict[str, str] = None, uploaded_by: str = "AUTO") -> str:
         """Save uploaded files to timestamped folder with standardized naming - Windows compatible
+        `files` maps original filename -> staged temp file path; staged files are
+        moved (not copied) into the run folder, so they must live on the same
+        filesystem as UPLOAD_DIR.
         Supports cycle subfolders and direction metadata. Returns run_folder path.
         """
         # Prepare run folder (kept for backward compatibility)
         run_folder = os.path.join(UPLOAD_DIR, run_id)
         os.makedirs(run_folder, exist_ok=True)
+        invalidate_runs()
+        record_latest_run(run_id)
 
         # Normalize run-level cycle
         cycle_id = None
@@ -46,7 +83,7 @@ class FileHandler:
         saved_files = {}
         file_metadata = {}
 
-        for filename, file_content in files.items():
+        for filename, staged_path in files.items():
             # Determine file type using enhanced pattern matching
             file_type = self._determine_file_type(filename, file_type_mapping)
 
@@ -58,7 +95,7 @@ class FileHandler:
 
             try:
                 # Validate file content before saving
-                if self._validate_file_content(file_content, filename):
+                if self._validate_file_content(staged_path, filename):
                     # Ensure write-once: do not overwrite existing files
                     final_path = file_path
                     suffix = 1
@@ -66,8 +103,7 @@ class FileHandler:
                         name, ext = os.path.splitext(standardized_name)
                         final_path = os.path.join(run_folder, f"{name}_{suffix}{ext}")
                         suffix += 1
-                    with open(final_path, 'wb') as f:
-                        f.write(file_content)
+                    os.replace(staged_path, final_path)
                     # Make saved file read-only where possible (write-once)
                     try:
                         os.chmod(final_path, 0o444)
@@ -89,7 +125,7 @@ class FileHandler:
                         'standardized_name': os.path.basename(file_path),
                         'file_type': file_type,
                         'original_name': filename,
-                        'file_size': len(file_content),
+                        'file_size': os.path.getsize(file_path),
                         'saved_at': os.path.getctime(file_path),
                         'legacy_path': file_path,
                         'uploaded_by': uploaded_by or 'AUTO',
@@ -109,6 +145,9 @@ class FileHandler:
         # add run-level metadata (persist canonical cycle_id when available)
         meta = {
             'run_id': run_id,
+            # Folder holding the saved files, relative to the run root; lets
+            # readers resolve it without walking the run tree
+            'run_folder': os.path.relpath(run_folder, os.path.join(UPLOAD_DIR, run_id)),
             'cycle_id': cycle_id if cycle_id else cycle,
             'direction': direction,
             'run_date': run_date,
@@ -127,7 +166,7 @@ class FileHandler:
             pass
 
         # ALSO store files in structured layout inside run_id folder
-        for filename, file_content in files.items():
+        for filename in files:
             try:
                 info = file_metadata.get(filename, {})
                 file_type = info.get('file_type') or self._determine_file_type(filename, file_type_mapping)
@@ -156,16 +195,11 @@ class FileHandler:
                 dest_path = os.path.join(dest_dir, file_metadata[filename]['standardized_name'])
 
                 legacy = file_metadata[filename].get('legacy_path')
-                if legacy and os.path.exists(legacy):
-                    try:
-                        import shutil
-                        shutil.copy2(legacy, dest_path)
-                    except Exception:
-                        with open(dest_path, 'wb') as f:
-                            f.write(file_content)
-                else:
-                    with open(dest_path, 'wb') as f:
-                        f.write(file_content)
+                import shutil
+                try:
+                    shutil.copy2(legacy, dest_path)
+                except Exception:
+                    shutil.copyfile(legacy, dest_path)
 
                 file_metadata[filename]['structured_path'] = dest_path
             except Exception as e:
@@ -176,8 +210,8 @@ class FileHandler:
 
         return run_folder
 
-    def validate_file_bytes(self, file_content: bytes, filename: str) -> (bool, str):
-        """Validate bytes of uploaded file to enforce required fields and formats.
+    def validate_file_bytes(self, file_content: Union[bytes, str], filename: str) -> (bool, str):
+        """Validate an uploaded file (bytes or a path on disk) to enforce required fields and formats.
         Enhanced with UPI-specific validation rules.
         Returns (True, "") if valid or (False, error_message).
         """
@@ -185,15 +219,16 @@ class FileHandler:
         import pandas as pd
 
         try:
+            src = BytesIO(file_content) if isinstance(file_content, bytes) else file_content
             # File format validation
             ext = filename.lower()
             if ext.endswith('.csv'):
-                df = pd.read_csv(BytesIO(file_content))
+                df = pd.read_csv(src)
             elif ext.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(BytesIO(file_content))
+                df = pd.read_excel(src)
             elif ext.endswith('.txt'):
                 # Handle pipe/tab delimited text files
-                df = pd.read_csv(BytesIO(file_content), sep='\t', engine='python')
+                df = pd.read_csv(src, sep='\t', engine='python')
             else:
                 return False, 'Unsupported file extension; only CSV/Excel/TXT allowed'
 
@@ -568,20 +603,23 @@ class FileHandler:
             # Default to CSV for financial data files
             return '.csv'
 
-    def _validate_file_content(self, file_content: bytes, filename: str) -> bool:
-        """Validate file content before saving"""
-        if not file_content or len(file_content) == 0:
+    def _validate_file_content(self, file_path: str, filename: str) -> bool:
+        """Validate a staged file before saving"""
+        size = os.path.getsize(file_path)
+        if size == 0:
             logger.warning(f"File '{filename}' is empty.")
             return False
 
         # Check for minimum file size (at least 10 bytes for valid data)
-        if len(file_content) < 10:
+        if size < 10:
             logger.warning(f"File '{filename}' is too small to be a valid data file.")
             return False
 
         # Validate file content based on extension
         if filename.lower().endswith('.xlsx'):
-            if not self._is_xlsx(file_content):
+            with open(file_path, 'rb') as f:
+                head = f.read(4)
+            if not self._is_xlsx(head):
                 logger.error(f"File '{filename}' has an .xlsx extension but is not a valid XLSX file.")
                 return False
         
@@ -643,7 +681,10 @@ class FileHandler:
             
             if filename.endswith('.csv'):
                 try:
-                    df = pd.read_csv(filepath)
+                    if FAST_IO and PYARROW_AVAILABLE:
+                        df = _read_csv_arrow(filepath)
+                    else:
+                        df = pd.read_csv(filepath)
                 except Exception as e:
                     print(f"Error reading CSV file {filepath}: {e}")
                     continue
@@ -1,89 +1,148 @@
+import asyncio
 import io
 import logging
 import os
 import re
+from typing import BinaryIO, Union
+
 import pandas as pd
+from openpyxl import load_workbook
 
 logger = logging.getLogger(__name__)
 
 
-async def validate_file_columns(content: bytes, filename: str, file_type: str) -> dict:
-    """Validate that required columns exist in uploaded files with flexible column name matching"""
+# Define required columns with possible name variations for flexible matching
+REQUIRED_COLUMNS_FLEXIBLE = {
+    'cbs_inward': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
+        'Debit_Credit': ['Debit_Credit', 'debit_credit', 'd/c', 'dr/cr', 'dr_cr', 'type', 'transaction_type'],
+    },
+    'cbs_outward': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
+        'Debit_Credit': ['Debit_Credit', 'debit_credit', 'd/c', 'dr/cr', 'dr_cr', 'type', 'transaction_type'],
+    },
+    'switch': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
+    },
+    'npci_inward': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
+    },
+    'npci_outward': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
+    },
+    'ntsl': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+    },
+    'adjustment': {
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
+        'Reason': ['Reason', 'reason', 'description', 'desc', 'remarks', 'adjustment_type', 'type'],
+    },
+    'drc': {
+        'Tran Date': ['Tran Date', 'tran date', 'tran_date', 'date', 'transaction date'],
+        'Tran ID': ['Tran ID', 'tran id', 'tran_id', 'transaction id', 'transaction_id'],
+        'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
+        'Tran_Amt': ['Tran_Amt', 'tran_amt', 'tran amount', 'transaction amount', 'amount', 'amt'],
+        'Remit Bank Name': ['Remit Bank Name', 'remit bank name'],
+        'Remit Bank IFSC': ['Remit Bank IFSC', 'remit bank ifsc'],
+        'Bene Bank Name': ['Bene Bank Name', 'bene bank name'],
+        'Bene Bank IFSC': ['Bene Bank IFSC', 'bene bank ifsc'],
+        'Res Code': ['Res Code', 'res code', 'response code', 'rc'],
+        'Tran Type': ['Tran Type', 'tran type', 'tran_type', 'transaction type'],
+    },
+}
+
+# Define which columns are critical (must be present) vs optional (warnings only)
+CRITICAL_COLUMNS = {
+    'RRN', 'Amount', 'Tran_Amt', 'Tran Date', 'Tran ID', 'Res Code', 'Tran Type',
+    'Remit Bank Name', 'Remit Bank IFSC', 'Bene Bank Name', 'Bene Bank IFSC'
+}  # Always required
+OPTIONAL_COLUMNS = {'Date', 'Debit_Credit', 'Reason'}  # Warnings only if missing
+
+# file_type -> canonical column -> normalized (stripped, lower-cased) aliases,
+# built once so each upload does one set check per required column.
+_ALIAS_INDEX = {
+    file_type: {
+        canonical: frozenset(str(name).strip().lower() for name in aliases)
+        for canonical, aliases in cols.items()
+    }
+    for file_type, cols in REQUIRED_COLUMNS_FLEXIBLE.items()
+}
+
+
+def _as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Wrap raw bytes in a BytesIO; file objects are used as-is."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _read_header(stream: BinaryIO, is_excel: bool) -> list:
+    """Return the column names of an upload without parsing its data rows."""
+    stream.seek(0)
+    if is_excel:
+        wb = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            # Some exporters write a stale <dimension> (e.g. A1:A1); trust the cells instead
+            ws.reset_dimensions()
+            first_row = next(ws.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        return [f"Unnamed: {i}" if v is None else v for i, v in enumerate(first_row)]
+    return list(pd.read_csv(stream, nrows=0, dtype=str).columns)
+
+
+def _read_columns(stream: BinaryIO, is_excel: bool, usecols: list) -> pd.DataFrame:
+    """Load only `usecols` from an upload for row-level checks."""
+    stream.seek(0)
+    if is_excel:
+        return pd.read_excel(stream, engine='openpyxl', dtype=str, usecols=usecols)
+    return pd.read_csv(stream, dtype=str, usecols=usecols)
+
+
+async def validate_file_columns(content: Union[bytes, str, os.PathLike, BinaryIO], filename: str, file_type: str) -> dict:
+    """Validate that required columns exist in uploaded files with flexible column name matching
+
+    `content` may be a path on disk, raw bytes or a seekable binary file
+    object (an open file, or UploadFile.file), so callers need not load the
+    file into memory.
+    Column checks run against the header row alone; data rows are parsed
+    only when those pass, and only for the RRN/amount columns that the
+    row-level checks inspect.
+    """
+    if isinstance(content, (str, os.PathLike)):
+        with open(content, 'rb') as fb:
+            return await validate_file_columns(fb, filename, file_type)
+
     try:
-        # Read file content into DataFrame - handle both CSV and Excel files
+        # Read only the header first - handle both CSV and Excel files
         _, ext = os.path.splitext(filename)
-        if ext.lower() in ('.xlsx', '.xls'):
-            df = pd.read_excel(io.BytesIO(content), engine='openpyxl', dtype=str)
-        else:
-            df = pd.read_csv(io.BytesIO(content), dtype=str)
+        is_excel = ext.lower() in ('.xlsx', '.xls')
+        stream = _as_stream(content)
+        # pandas/openpyxl parsing is blocking; keep it off the event loop
+        columns = await asyncio.to_thread(_read_header, stream, is_excel)
 
         # Log actual columns present in the file for debugging
-        logger.info(f"File: {filename}, Type: {file_type}, Columns found: {list(df.columns)}")
-
-        # Define required columns with possible name variations for flexible matching
-        required_columns_flexible = {
-            'cbs_inward': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
-                'Debit_Credit': ['Debit_Credit', 'debit_credit', 'd/c', 'dr/cr', 'dr_cr', 'type', 'transaction_type'],
-            },
-            'cbs_outward': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
-                'Debit_Credit': ['Debit_Credit', 'debit_credit', 'd/c', 'dr/cr', 'dr_cr', 'type', 'transaction_type'],
-            },
-            'switch': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
-            },
-            'npci_inward': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
-            },
-            'npci_outward': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Date': ['Date', 'date', 'tran date', 'transaction date', 'tran_date', 'transaction_date', 'dt'],
-            },
-            'ntsl': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-            },
-            'adjustment': {
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Amount': ['Amount', 'amount', 'amt', 'tran amount', 'transaction amount', 'tran_amt', 'transaction_amt', 'value'],
-                'Reason': ['Reason', 'reason', 'description', 'desc', 'remarks', 'adjustment_type', 'type'],
-            },
-            'drc': {
-                'Tran Date': ['Tran Date', 'tran date', 'tran_date', 'date', 'transaction date'],
-                'Tran ID': ['Tran ID', 'tran id', 'tran_id', 'transaction id', 'transaction_id'],
-                'RRN': ['RRN', 'rrn', 'reference number', 'ref number', 'reference', 'ref'],
-                'Tran_Amt': ['Tran_Amt', 'tran_amt', 'tran amount', 'transaction amount', 'amount', 'amt'],
-                'Remit Bank Name': ['Remit Bank Name', 'remit bank name'],
-                'Remit Bank IFSC': ['Remit Bank IFSC', 'remit bank ifsc'],
-                'Bene Bank Name': ['Bene Bank Name', 'bene bank name'],
-                'Bene Bank IFSC': ['Bene Bank IFSC', 'bene bank ifsc'],
-                'Res Code': ['Res Code', 'res code', 'response code', 'rc'],
-                'Tran Type': ['Tran Type', 'tran type', 'tran_type', 'transaction type'],
-            },
-        }
+        logger.info(f"File: {filename}, Type: {file_type}, Columns found: {columns}")
 
         # Get required columns for this file type
-        req_cols_dict = required_columns_flexible.get(file_type, {})
-
-        # Define which columns are critical (must be present) vs optional (warnings only)
-        critical_columns = [
-            'RRN', 'Amount', 'Tran_Amt', 'Tran Date', 'Tran ID', 'Res Code', 'Tran Type',
-            'Remit Bank Name', 'Remit Bank IFSC', 'Bene Bank Name', 'Bene Bank IFSC'
-        ]  # Always required
-        optional_columns = ['Date', 'Debit_Credit', 'Reason']  # Warnings only if missing
+        req_cols_dict = REQUIRED_COLUMNS_FLEXIBLE.get(file_type, {})
+        alias_index = _ALIAS_INDEX.get(file_type, {})
 
         # Case-insensitive column matching
-        normalized_map = {str(col).strip().lower(): col for col in df.columns}
+        normalized_map = {str(col).strip().lower(): col for col in columns}
         normalized_cols = set(normalized_map.keys())
 
         def find_column(possible_names):
@@ -106,8 +165,8 @@ async def validate_file_columns(content: bytes, filename: str, file_type: str) -
             legacy_required = ["RRN", "Amount", "Date"]
 
             def has_col(req_key: str) -> bool:
-                possible = req_cols_dict.get(req_key, [req_key])
-                return any(str(name).strip().lower() in normalized_cols for name in possible)
+                possible = alias_index.get(req_key, frozenset((req_key.lower(),)))
+                return not possible.isdisjoint(normalized_cols)
 
             strict_ok = all(has_col(c) for c in strict_required)
             legacy_ok = all(has_col(c) for c in legacy_required)
@@ -129,14 +188,13 @@ async def validate_file_columns(content: bytes, filename: str, file_type: str) -
         # Check for missing columns using flexible matching
         missing_critical = []
         missing_optional = []
-        for req_col, possible_names in req_cols_dict.items():
-            if req_col not in active_required_keys and req_col in critical_columns:
+        for req_col, possible_names in alias_index.items():
+            if req_col not in active_required_keys and req_col in CRITICAL_COLUMNS:
                 continue
-            found = any(str(name).strip().lower() in normalized_cols for name in possible_names)
-            if not found:
-                if req_col in critical_columns:
+            if possible_names.isdisjoint(normalized_cols):
+                if req_col in CRITICAL_COLUMNS:
                     missing_critical.append(req_col)
-                elif req_col in optional_columns:
+                elif req_col in OPTIONAL_COLUMNS:
                     missing_optional.append(req_col)
 
         # If critical columns are missing, fail validation
@@ -159,18 +217,6 @@ async def validate_file_columns(content: bytes, filename: str, file_type: str) -
                 possible = req_cols_dict[missing]
                 warnings.append(f"Missing optional column: {missing} (possible names: {', '.join(possible)})")
 
-        # Check for empty DataFrame
-        if len(df) == 0:
-            return {
-                "valid": False,
-                "error": "File contains no data rows",
-                "suggestion": "Please ensure the file contains transaction data",
-            }
-
-        # Warnings (don't block upload)
-        if df.isnull().values.any():
-            warnings.append(f"File contains {df.isnull().sum().sum()} null values")
-
         # Row-level strict checks: reject files with malformed core values.
         row_errors = []
         rrn_col = None
@@ -184,6 +230,22 @@ async def validate_file_columns(content: bytes, filename: str, file_type: str) -
         if not amount_col and "Amount" in req_cols_dict:
             amount_col = find_column(req_cols_dict["Amount"])
 
+        # Parse data rows only for the columns checked below (first column
+        # as a fallback so the empty-file check still works).
+        usecols = list(dict.fromkeys(c for c in (rrn_col, amount_col) if c)) or ([0] if columns else [])
+        if usecols:
+            df = await asyncio.to_thread(_read_columns, stream, is_excel, usecols)
+        else:
+            df = pd.DataFrame()
+
+        # Check for empty DataFrame
+        if len(df) == 0:
+            return {
+                "valid": False,
+                "error": "File contains no data rows",
+                "suggestion": "Please ensure the file contains transaction data",
+            }
+
         def normalize_rrn(value) -> str:
             if value is None:
                 return ""
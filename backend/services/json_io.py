@@ -0,0 +1,133 @@
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+import orjson
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Files at least this large are parsed straight from a read-only mapping
+_MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Pretty-printed like the old json.dump(indent=2, default=str) output:
+# datetimes still go through default=str, numpy scalars become plain numbers.
+_DUMP_OPTIONS = (
+    orjson.OPT_INDENT_2
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+def write_json(path: str, data: Any) -> None:
+    """Serialize data with orjson and write it to path in one call."""
+    payload = orjson.dumps(data, default=str, option=_DUMP_OPTIONS)
+    with open(path, 'wb') as f:
+        f.write(payload)
+
+
+def dump_json_bytes(data: Any) -> bytes:
+    """Serialize data compactly, converting values the same way write_json does."""
+    return orjson.dumps(data, default=str, option=_DUMP_OPTIONS & ~orjson.OPT_INDENT_2)
+
+
+def to_jsonable(data: Any) -> Any:
+    """Return data as plain JSON types, converted the same way write_json would."""
+    return orjson.loads(dump_json_bytes(data))
+
+
+def _loads(buf) -> Any:
+    try:
+        return orjson.loads(buf)
+    except orjson.JSONDecodeError:
+        # Files written by the stdlib encoder may contain NaN/Infinity,
+        # which orjson rejects but json accepts
+        return json.loads(bytes(buf))
+
+
+def read_json(path: str) -> Any:
+    """Parse the JSON file at path with orjson; large files are memory-mapped."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return _loads(view)
+        data = f.read()
+    return _loads(data)
+
+
+# Parsed documents keyed by path, valid while (mtime_ns, size) is unchanged,
+# each with a dict of values derived from it (see read_json_cached_with).
+# Kept small: recon outputs can be large and only the latest runs are hot.
+_PARSED_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], Any, Dict[str, Any]]]" = OrderedDict()
+_PARSED_CACHE_MAX = 4
+_parsed_cache_lock = threading.Lock()
+
+
+def _cached_entry(path: str) -> Tuple[Tuple[int, int], Any, Dict[str, Any]]:
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _parsed_cache_lock:
+        cached = _PARSED_CACHE.get(path)
+        if cached is not None and cached[0] == stamp:
+            _PARSED_CACHE.move_to_end(path)
+            return cached
+    entry = (stamp, read_json(path), {})
+    with _parsed_cache_lock:
+        _PARSED_CACHE[path] = entry
+        _PARSED_CACHE.move_to_end(path)
+        if len(_PARSED_CACHE) > _PARSED_CACHE_MAX:
+            _PARSED_CACHE.popitem(last=False)
+    return entry
+
+
+def read_json_cached(path: str) -> Any:
+    """Like read_json, but reuse the parsed result until the file changes.
+
+    The result is shared between callers and must be treated as read-only;
+    use read_json for data that will be modified and written back.
+    """
+    return _cached_entry(path)[1]
+
+
+def read_json_cached_with(path: str, name: str, build: Callable[[Any], Any]) -> Tuple[Any, Any]:
+    """Return (data, build(data)) for path, as read_json_cached does.
+
+    build's result is stored under `name` alongside the parsed document, so it
+    is computed once per parse and evicted with it. Both are read-only.
+    """
+    _, data, derived = _cached_entry(path)
+    try:
+        return data, derived[name]
+    except KeyError:
+        value = derived[name] = build(data)
+        return data, value
+
+
+def iter_json_items(path: str, prefix: str) -> Iterator[Any]:
+    """Yield the elements of the array at prefix (e.g. 'exceptions.item') one at a time.
+
+    Requires ijson; only one element is held in memory at a time. Raises
+    ValueError for documents ijson rejects, such as the NaN/Infinity tokens
+    older stdlib-written files may contain; read_json accepts those.
+    """
+    with open(path, 'rb') as f:
+        try:
+            yield from ijson.items(f, prefix, use_float=True)
+        except ijson.JSONError as e:
+            raise ValueError(f"{path}: cannot stream JSON ({e})") from e
+
+
+def file_contains(path: str, needle: bytes) -> bool:
+    """Return whether the raw bytes of the file at path contain needle (memory-mapped)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(needle) != -1
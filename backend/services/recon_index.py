@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import orjson
+
+from services.json_io import dump_json_bytes
+
+# SQLite side-car next to recon_output.json, keyed by RRN and UPI transaction id
+RECON_INDEX_FILE = 'recon_index.sqlite'
+
+# Sections searched by transaction lookups, in priority order
+INDEXED_SECTIONS = ('exceptions', 'ttum_candidates')
+
+
+def _key(value) -> Optional[str]:
+    # Missing, None and empty ids are stored as NULL so they never match a lookup
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+def _index_rows(results: Dict) -> Iterator[Tuple[str, Optional[str], Optional[str], bytes]]:
+    for section in INDEXED_SECTIONS:
+        records = results.get(section)
+        if not isinstance(records, list):
+            continue
+        for rec in records:
+            if isinstance(rec, dict):
+                yield section, _key(rec.get('rrn')), _key(rec.get('upi_tran_id')), dump_json_bytes(rec)
+
+
+def write_recon_index(output_dir: str, results: Dict) -> None:
+    """Atomically write the RRN / UPI transaction id index for results in output_dir."""
+    tmp_path = os.path.join(output_dir, f'.{RECON_INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            # seq keeps the section/list order, so the first match wins as in a scan
+            conn.execute(
+                'CREATE TABLE records (seq INTEGER PRIMARY KEY, section TEXT, rrn TEXT, upi_tran_id TEXT, record BLOB)'
+            )
+            conn.executemany(
+                'INSERT INTO records (section, rrn, upi_tran_id, record) VALUES (?, ?, ?, ?)',
+                _index_rows(results),
+            )
+            conn.execute('CREATE INDEX idx_rrn ON records (rrn)')
+            conn.execute('CREATE INDEX idx_upi_tran_id ON records (upi_tran_id)')
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, os.path.join(output_dir, RECON_INDEX_FILE))
+    except (OSError, sqlite3.Error):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def open_recon_index(output_dir: str, source_mtime_ns: int) -> Optional[sqlite3.Connection]:
+    """Open the index for output_dir, or return None if missing or older than recon_output.json.
+
+    recon_output.json is also rewritten outside the recon run (force match,
+    rollback), so an index older than it is treated as stale.
+    """
+    path = os.path.join(output_dir, RECON_INDEX_FILE)
+    try:
+        if os.stat(path).st_mtime_ns < source_mtime_ns:
+            return None
+        return sqlite3.connect(path)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def find_indexed_record(
+    conn: sqlite3.Connection,
+    rrn: Optional[str] = None,
+    txn_id: Optional[str] = None,
+) -> Optional[Tuple[str, Dict]]:
+    """Return (section, record) for the first record matching rrn or txn_id, if any.
+
+    Empty ids are ignored, as in a scan of recon_output.json.
+    """
+    clauses = []
+    params = []
+    if rrn:
+        clauses.append('rrn = ?')
+        params.append(rrn)
+    if txn_id:
+        clauses.append('upi_tran_id = ?')
+        params.append(txn_id)
+    if not clauses:
+        return None
+    row = conn.execute(
+        f'SELECT section, record FROM records WHERE {" OR ".join(clauses)} ORDER BY seq LIMIT 1',
+        params,
+    ).fetchone()
+    if row is None:
+        return None
+    return row[0], orjson.loads(row[1])
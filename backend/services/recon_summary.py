@@ -0,0 +1,49 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import orjson
+
+# Side-car next to recon_output.json holding only what /summary needs
+RECON_SUMMARY_FILE = 'recon_summary.json'
+
+
+def summarize_recon_output(results: Dict) -> Dict:
+    """Reduce full recon results to the fields used by the summary endpoints."""
+    details = results.get('details', {})
+    return {
+        'summary': results.get('summary', {}),
+        'exceptions_count': len(results.get('exceptions', [])),
+        'hanging_count': details.get('switch_breakdown', {}).get('HANGING', 0),
+    }
+
+
+def write_recon_summary(output_dir: str, recon_summary: Dict) -> None:
+    """Atomically write a summarize_recon_output() result as the side-car in output_dir."""
+    data = orjson.dumps(recon_summary, default=str)
+    tmp_path = os.path.join(output_dir, f'.{RECON_SUMMARY_FILE}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(output_dir, RECON_SUMMARY_FILE))
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def read_recon_summary(output_dir: str, source_mtime_ns: int) -> Optional[Dict]:
+    """Return the side-car for output_dir, or None if missing or older than recon_output.json.
+
+    recon_output.json is also rewritten outside the recon run (force match,
+    rollback), so a side-car older than it is treated as stale.
+    """
+    path = os.path.join(output_dir, RECON_SUMMARY_FILE)
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_mtime_ns < source_mtime_ns:
+                return None
+            return orjson.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
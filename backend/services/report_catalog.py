@@ -7,13 +7,14 @@ import pandas as pd
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 from services.annexure_iv import generate_annexure_iv_csv
+from services.run_index import list_runs
 
 
 def _resolve_latest_run() -> str:
-    runs = [d for d in os.listdir(UPLOAD_DIR) if d.startswith("RUN_")]
+    runs = list_runs(UPLOAD_DIR)
     if not runs:
         raise FileNotFoundError("No runs found in upload directory")
-    return sorted(runs)[-1]
+    return runs[-1]
 
 
 def resolve_run_id(run_id: Optional[str]) -> str:
@@ -567,6 +568,18 @@ def generate_rbi_reporting(run_id: str) -> Optional[str]:
     return _write_csv(run_id, "rbi_reporting.csv", df)
 
 
+def _first_gl_file(folder: str) -> Optional[str]:
+    """First CSV/XLSX file in folder (scandir order), or None if there is none."""
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.endswith((".csv", ".xlsx")) and entry.is_file(follow_symlinks=False):
+                    return entry.path
+    except FileNotFoundError:
+        pass
+    return None
+
+
 def find_gl_statement(run_id: str) -> Optional[str]:
     # Prefer OUTPUT_DIR/<run_id>/reports/gl_statement.csv
     candidate = os.path.join(OUTPUT_DIR, run_id, "reports", "gl_statement.csv")
@@ -584,16 +597,9 @@ def find_gl_statement(run_id: str) -> Optional[str]:
     for path in upi_candidates:
         if os.path.exists(path):
             return path
-    # fallback to output gl_statement folder
-    out_gl = os.path.join(OUTPUT_DIR, run_id, "gl_statement")
-    if os.path.exists(out_gl):
-        for f in os.listdir(out_gl):
-            if f.endswith((".csv", ".xlsx")):
-                return os.path.join(out_gl, f)
-    # fallback to upload folder
-    up_gl = os.path.join(UPLOAD_DIR, run_id, "gl_statement")
-    if os.path.exists(up_gl):
-        for f in os.listdir(up_gl):
-            if f.endswith((".csv", ".xlsx")):
-                return os.path.join(up_gl, f)
+    # fallback to output gl_statement folder, then the upload folder
+    for base in (OUTPUT_DIR, UPLOAD_DIR):
+        found = _first_gl_file(os.path.join(base, run_id, "gl_statement"))
+        if found:
+            return found
     return None
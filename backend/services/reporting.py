@@ -1,9 +1,10 @@
 import os
 import csv
 import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from decimal import Decimal, ROUND_HALF_UP
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional
 from config import OUTPUT_DIR
 
 try:
@@ -12,6 +13,13 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment
@@ -19,6 +27,12 @@ try:
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
 
 def _ensure_run_dirs(run_id: str):
     base = os.path.join(OUTPUT_DIR, run_id)
@@ -34,13 +48,33 @@ def _ensure_run_dirs(run_id: str):
 
 # Removed _format_value to preserve native numeric/date types in outputs
 
+# Large write buffer so the OS sees few, big writes for CSV outputs
+CSV_WRITE_BUFFER = 4 * 1024 * 1024
 
-def write_report(run_id: str, cycle_id: Optional[str], subdir: str, filename: str, headers: List[str], rows: List[Dict]):
+
+def open_csv_output(path: str):
+    """Open `path` for CSV writing: UTF-8 (no BOM), newline-safe, large buffer.
+
+    On platforms with posix_fadvise the page cache is told the file is
+    written sequentially.
+    """
+    f = open(path, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return f
+
+
+def write_report(run_id: str, cycle_id: Optional[str], subdir: str, filename: str, headers: List[str], rows: Iterable[Dict]):
     """Write a CSV report under OUTPUT_DIR/<run_id>/<subdir>/[cycle_<cycle_id>/]filename.
 
     - headers: ordered list of column names
-    - rows: list of dicts; values will be formatted according to key heuristics
-    Ensures UTF-8 (no BOM) and newline-safe writing on Windows.
+    - rows: iterable of dicts (a generator is consumed lazily); values will
+      be formatted according to key heuristics
+    Ensures UTF-8 (no BOM) and newline-safe writing on Windows. If iterating
+    `rows` raises, the partial file is removed and the error re-raised.
     """
     _ensure_run_dirs(run_id)
     base = os.path.join(OUTPUT_DIR, run_id, subdir)
@@ -51,45 +85,79 @@ def write_report(run_id: str, cycle_id: Optional[str], subdir: str, filename: st
     out_path = os.path.join(base, filename)
 
     # Write CSV with exact header order and UTF-8 encoding
-    with open(out_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        for r in rows:
-            row = []
-            for h in headers:
-                row.append(r.get(h))
-            writer.writerow(row)
-        # Explicitly flush to ensure all data is written
-        f.flush()
-        os.fsync(f.fileno())
+    try:
+        with open_csv_output(out_path) as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows([r.get(h) for h in headers] for r in rows)
+            # Explicitly flush to ensure all data is written
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception:
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        raise
 
     return out_path
 
 
-def write_ttum_xlsx(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], rows: List[Dict]) -> str:
-    """Write TTUM data to XLSX file using openpyxl.
-    
-    Args:
-        run_id: Run identifier
-        cycle_id: Optional cycle identifier
-        filename: Output filename (without extension)
-        headers: List of column headers
-        rows: List of dictionaries with row data
-    
-    Returns:
-        Path to created XLSX file
-    """
-    if not OPENPYXL_AVAILABLE:
-        raise ImportError("openpyxl is required for XLSX export. Install with: pip install openpyxl")
-    
-    _ensure_run_dirs(run_id)
-    base = os.path.join(OUTPUT_DIR, run_id, 'ttum')
-    if cycle_id:
-        base = os.path.join(base, f"cycle_{cycle_id}")
-    os.makedirs(base, exist_ok=True)
-    
-    out_path = os.path.join(base, f"{filename}.xlsx")
-    
+def _is_missing(v) -> bool:
+    # pd.NA == pd.NA is NA (truthiness raises), so test identity / float NaN instead
+    if isinstance(v, float):
+        return v != v
+    return PANDAS_AVAILABLE and (v is pd.NA or v is pd.NaT)
+
+
+def _write_xlsx_xlsxwriter(out_path: str, headers: List[str], rows: Iterable[Dict]):
+    """Stream rows into `out_path` with xlsxwriter, one row in memory at a time."""
+    # No hyperlink/formula conversion: TTUM text must land in cells verbatim
+    wb = xlsxwriter.Workbook(out_path, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    try:
+        ws = wb.add_worksheet("TTUM")
+        header_fmt = wb.add_format({
+            'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#4472C4',
+            'align': 'center', 'valign': 'vcenter', 'text_wrap': True,
+        })
+        cell_opts = {'align': 'left', 'valign': 'vcenter', 'text_wrap': True}
+        cell_fmt = wb.add_format(cell_opts)
+        datetime_fmt = wb.add_format({**cell_opts, 'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        date_fmt = wb.add_format({**cell_opts, 'num_format': 'yyyy-mm-dd'})
+
+        widths = [len(str(h)) for h in headers]
+        ws.write_row(0, 0, headers, header_fmt)
+        for r, row_data in enumerate(rows, 1):
+            for c, header in enumerate(headers):
+                value = row_data.get(header)
+                if _is_missing(value):
+                    # Missing values (NaN/NA/NaT) become blank cells
+                    ws.write_blank(r, c, None, cell_fmt)
+                    continue
+                if isinstance(value, datetime):
+                    ws.write_datetime(r, c, value, datetime_fmt)
+                elif isinstance(value, date):
+                    ws.write_datetime(r, c, value, date_fmt)
+                else:
+                    ws.write(r, c, value, cell_fmt)
+                width = len(str(value))
+                if width > widths[c]:
+                    widths[c] = width
+
+        # Column info is emitted at close, so widths can be set after streaming
+        for c, width in enumerate(widths):
+            ws.set_column(c, c, min(width + 2, 50))
+        ws.freeze_panes(1, 0)
+    finally:
+        wb.close()
+
+
+def _write_xlsx_openpyxl(out_path: str, headers: List[str], rows: Iterable[Dict]):
+    """Build the workbook in memory with openpyxl (fallback without xlsxwriter)."""
     # Create workbook and worksheet
     wb = Workbook()
     ws = wb.active
@@ -134,10 +202,44 @@ def write_ttum_xlsx(run_id: str, cycle_id: Optional[str], filename: str, headers
         wb.close()
     except Exception:
         pass
+
+
+def write_ttum_xlsx(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], rows: Iterable[Dict]) -> str:
+    """Write TTUM data to XLSX file.
+
+    Uses xlsxwriter in constant-memory mode when installed, so rows (which
+    may be a generator) are streamed to disk; otherwise falls back to
+    openpyxl. Both produce the same styled header, frozen header row and
+    capped column widths.
+    
+    Args:
+        run_id: Run identifier
+        cycle_id: Optional cycle identifier
+        filename: Output filename (without extension)
+        headers: List of column headers
+        rows: Iterable of dictionaries with row data
+    
+    Returns:
+        Path to created XLSX file
+    """
+    if not (XLSXWRITER_AVAILABLE or OPENPYXL_AVAILABLE):
+        raise ImportError("xlsxwriter or openpyxl is required for XLSX export. Install with: pip install xlsxwriter")
+    
+    _ensure_run_dirs(run_id)
+    base = os.path.join(OUTPUT_DIR, run_id, 'ttum')
+    if cycle_id:
+        base = os.path.join(base, f"cycle_{cycle_id}")
+    os.makedirs(base, exist_ok=True)
+    
+    out_path = os.path.join(base, f"{filename}.xlsx")
+    if XLSXWRITER_AVAILABLE:
+        _write_xlsx_xlsxwriter(out_path, headers, rows)
+    else:
+        _write_xlsx_openpyxl(out_path, headers, rows)
     return out_path
 
 
-def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], rows: List[Dict]) -> str:
+def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], rows: Iterable[Dict]) -> str:
     """Write TTUM data to CSV file.
     
     Args:
@@ -145,7 +247,7 @@ def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers:
         cycle_id: Optional cycle identifier
         filename: Output filename (without extension)
         headers: List of column headers
-        rows: List of dictionaries with row data
+        rows: Iterable of dictionaries with row data (consumed lazily)
     
     Returns:
         Path to created CSV file
@@ -159,14 +261,10 @@ def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers:
     out_path = os.path.join(base, f"{filename}.csv")
 
     # Write CSV with exact header order and UTF-8 encoding
-    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+    with open_csv_output(out_path) as f:
         writer = csv.writer(f)
         writer.writerow(headers)
-        for row_data in rows:
-            row = []
-            for header in headers:
-                row.append(row_data.get(header))
-            writer.writerow(row)
+        writer.writerows([row_data.get(h) for h in headers] for row_data in rows)
         # Explicitly flush to ensure all data is written
         f.flush()
         os.fsync(f.fileno())
@@ -174,6 +272,102 @@ def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers:
     return out_path
 
 
+def write_dataframe_csv(df, path: str) -> str:
+    """Write a DataFrame to `path` as UTF-8 CSV with a BOM (Excel-friendly).
+
+    Frames made only of text columns go through pyarrow's multithreaded CSV
+    writer when it is installed. Anything else (numbers, booleans, dates)
+    uses DataFrame.to_csv, so its formatting does not depend on whether
+    pyarrow is present.
+    """
+    if PYARROW_AVAILABLE and all(
+        pd.api.types.is_object_dtype(dt) or pd.api.types.is_string_dtype(dt) for dt in df.dtypes
+    ):
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            table = None
+        # Object columns may still hold non-strings that Arrow infers as
+        # bool/number; only all-text (or all-missing) columns are safe
+        if table is not None and not all(
+            pa.types.is_string(t) or pa.types.is_large_string(t) or pa.types.is_null(t)
+            for t in table.schema.types
+        ):
+            table = None
+        if table is not None:
+            with open(path, 'wb') as f:
+                f.write(b'\xef\xbb\xbf')
+                pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(quoting_style='needed'))
+            return path
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+# Upper bound on CSV files read at once by read_csv_table
+CSV_READ_WORKERS = 8
+
+
+def _read_csv_strings(path: str):
+    """Read one CSV into an Arrow table with every column as a string, or None if it has no header."""
+    # Pin every column to string so ids keep their leading zeros
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        return None
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in header},
+        strings_can_be_null=False,
+    )
+    return pa_csv.read_csv(path, convert_options=convert_options)
+
+
+def _concat_tables(tables):
+    """pa.concat_tables with schema promotion across pyarrow versions."""
+    try:
+        return pa.concat_tables(tables, promote_options='default')
+    except TypeError as e:
+        if isinstance(e, pa.ArrowException):
+            raise
+        # pyarrow < 14 has no promote_options keyword
+        return pa.concat_tables(tables, promote=True)
+
+
+def read_csv_table(paths: List[str]):
+    """Read CSV files into one Arrow table with every column as a string.
+
+    Files are read concurrently (pyarrow releases the GIL while parsing) and
+    concatenated in input order. Columns missing from a file are null for its
+    rows. Returns None when pyarrow is not installed or a file cannot be read
+    this way, so callers can fall back to csv.DictReader.
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    if not paths:
+        return pa.table({})
+    try:
+        with ThreadPoolExecutor(max_workers=min(CSV_READ_WORKERS, len(paths))) as pool:
+            tables = [t for t in pool.map(_read_csv_strings, paths) if t is not None]
+        if not tables:
+            return pa.table({})
+        return _concat_tables(tables)
+    except (OSError, UnicodeDecodeError, csv.Error, pa.ArrowException):
+        return None
+
+
+def write_table_csv(table, path: str) -> str:
+    """Write an Arrow table to `path` as UTF-8 CSV (no BOM).
+
+    Rows go through the csv module, batch by batch, so quoting and \r\n line
+    endings match write_ttum_csv; nulls are written as empty fields.
+    """
+    with open_csv_output(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(table.column_names)
+        for batch in table.to_batches():
+            writer.writerows(zip(*(column.to_pylist() for column in batch.columns)))
+    return path
+
+
 def write_ttum_pandas(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], rows: List[Dict], format: str = 'xlsx') -> str:
     """Write TTUM data using pandas (faster for large datasets).
     
@@ -245,6 +439,9 @@ def get_ttum_files(run_id: str, cycle_id: Optional[str] = None, format: str = 'a
             continue
         
         for filename in os.listdir(base_dir):
+            if filename.startswith('.'):
+                # In-flight or leaked temp files
+                continue
             if any(keyword in filename for keyword in ['ttum', 'unmatched', 'exceptions']):
                 filepath = os.path.join(base_dir, filename)
                 if os.path.isfile(filepath):
@@ -0,0 +1,230 @@
+import os
+import threading
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from config import UPLOAD_DIR
+from services.json_io import read_json
+
+# Pointer file holding the id of the newest run under UPLOAD_DIR
+LATEST_POINTER = 'LATEST'
+
+
+def scan_latest_run(root: str = UPLOAD_DIR) -> Optional[str]:
+    """Return the newest RUN_* directory name under root in a single scandir pass."""
+    try:
+        with os.scandir(root) as it:
+            return max(
+                (e.name for e in it if e.name.startswith('RUN_') and e.is_dir(follow_symlinks=False)),
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+
+
+# Sorted RUN_* names per root, keyed on the root's mtime; creating or
+# removing a run folder bumps it, so a stale listing is never served.
+_RUNS_CACHE: Dict[str, Tuple[int, Tuple[str, ...]]] = {}
+
+
+def list_runs(root: str = UPLOAD_DIR) -> Tuple[str, ...]:
+    """Return the RUN_* folder names under root, oldest first."""
+    try:
+        mtime_ns = os.stat(root).st_mtime_ns
+    except FileNotFoundError:
+        return ()
+    cached = _RUNS_CACHE.get(root)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    with os.scandir(root) as it:
+        runs = tuple(sorted(
+            e.name for e in it if e.name.startswith('RUN_') and e.is_dir(follow_symlinks=False)
+        ))
+    _RUNS_CACHE[root] = (mtime_ns, runs)
+    return runs
+
+
+def invalidate_runs(root: str = UPLOAD_DIR) -> None:
+    """Drop the cached listing for root after creating or removing a run folder.
+
+    The mtime check already catches this, but coarse filesystem timestamps can
+    leave two changes within one tick looking identical.
+    """
+    _RUNS_CACHE.pop(root, None)
+
+
+def _read_pointer(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, LATEST_POINTER), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def record_latest_run(run_id: str, root: str = UPLOAD_DIR, force: bool = False) -> None:
+    """Atomically point LATEST at run_id unless it already names a newer run."""
+    if not force:
+        current = _read_pointer(root)
+        if current and current > run_id:
+            return
+    tmp_path = os.path.join(root, f'.{LATEST_POINTER}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(run_id)
+        os.replace(tmp_path, os.path.join(root, LATEST_POINTER))
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def latest_run(root: str = UPLOAD_DIR) -> Optional[str]:
+    """Return the newest run id, reading the LATEST pointer when it is valid.
+
+    Falls back to a directory scan (and repairs the pointer) when the pointer
+    is missing or names a run folder that no longer exists, e.g. after a
+    rollback or for runs created before the pointer existed.
+    """
+    run_id = _read_pointer(root)
+    if run_id and os.path.isdir(os.path.join(root, run_id)):
+        return run_id
+    run_id = scan_latest_run(root)
+    if run_id:
+        record_latest_run(run_id, root, force=True)
+    return run_id
+
+
+# Walk results per run. Only hits are cached, and each is re-checked before
+# reuse, because files can land in nested folders without touching the
+# run folder's own mtime.
+_RUN_FOLDER_CACHE: Dict[str, str] = {}
+_RUN_FILE_CACHE: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+_RUN_DIR_CACHE: Dict[Tuple[str, str], str] = {}
+
+
+def iter_run_dirs(run_root: str) -> Iterator[Tuple[str, Set[str]]]:
+    """Yield (folder, file names) for run_root and its subfolders, top-down.
+
+    Same visiting order as os.walk, but built directly on os.scandir so
+    file/dir checks use the cached DirEntry type instead of extra stats.
+    """
+    stack = [run_root]
+    while stack:
+        folder = stack.pop()
+        files = set()
+        subdirs = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        files.add(entry.name)
+        except OSError:
+            continue
+        yield folder, files
+        stack.extend(reversed(subdirs))
+
+
+def _recorded_run_folder(run_root: str) -> Optional[str]:
+    """Return the upload folder recorded in run_root/metadata.json, if any."""
+    try:
+        meta = read_json(os.path.join(run_root, 'metadata.json'))
+    except (OSError, ValueError):
+        return None
+    rel = meta.get('run_folder') if isinstance(meta, dict) else None
+    if not rel:
+        return None
+    folder = os.path.normpath(os.path.join(run_root, rel))
+    return folder if os.path.isdir(folder) else None
+
+
+def resolve_run_folder(run_root: str) -> str:
+    """Return the folder under run_root holding the uploaded files.
+
+    Uses the folder recorded at upload time when present. Older runs may be
+    nested by cycle/direction; the first folder (walk order) containing
+    file_mapping.json or a CSV wins, else run_root itself.
+    """
+    cached = _RUN_FOLDER_CACHE.get(run_root)
+    if cached is not None and os.path.isdir(cached):
+        return cached
+    recorded = _recorded_run_folder(run_root)
+    if recorded is not None:
+        _RUN_FOLDER_CACHE[run_root] = recorded
+        return recorded
+    for root_dir, files in iter_run_dirs(run_root):
+        if 'file_mapping.json' in files or any(f.lower().endswith('.csv') for f in files):
+            _RUN_FOLDER_CACHE[run_root] = root_dir
+            return root_dir
+    return run_root
+
+
+def find_run_file(run_root: str, *names: str) -> Optional[str]:
+    """Return the path of the first of `names` found walking run_root, or None.
+
+    Folders are visited top-down as in os.walk; within a folder, earlier names win.
+    """
+    key = (run_root, names)
+    cached = _RUN_FILE_CACHE.get(key)
+    if cached is not None and os.path.isfile(cached):
+        return cached
+    for root_dir, files in iter_run_dirs(run_root):
+        for name in names:
+            if name in files:
+                path = os.path.join(root_dir, name)
+                _RUN_FILE_CACHE[key] = path
+                return path
+    return None
+
+
+def find_run_dir(run_root: str, name: str) -> Optional[str]:
+    """Return the path of the first folder called `name` walking run_root, or None.
+
+    Same result as the first os.walk root whose subfolders include `name`.
+    """
+    key = (run_root, name)
+    cached = _RUN_DIR_CACHE.get(key)
+    if cached is not None and os.path.isdir(cached):
+        return cached
+    stack = [run_root]
+    while stack:
+        folder = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry)
+        except OSError:
+            continue
+        for entry in subdirs:
+            if entry.name == name:
+                _RUN_DIR_CACHE[key] = entry.path
+                return entry.path
+        stack.extend(entry.path for entry in reversed(subdirs))
+    return None
+
+
+def find_run_subdir(run_root: str, name: str, max_depth: int = 2) -> Optional[str]:
+    """Return the path of the shallowest folder called `name` under run_root, or None.
+
+    Only folders up to max_depth levels below run_root are scanned for it, which
+    covers the run/cycle/direction layouts without walking every file.
+    """
+    level = [run_root]
+    for _ in range(max_depth + 1):
+        next_level = []
+        for folder in level:
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        if entry.name == name:
+                            return entry.path
+                        next_level.append(entry.path)
+            except OSError:
+                continue
+        level = sorted(next_level)
+    return None
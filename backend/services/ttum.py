@@ -1,74 +1,158 @@
+import hashlib
+import io
 import os
-from typing import List, Optional
-
-import pandas as pd
+import threading
+import zipfile
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from config import OUTPUT_DIR, UPLOAD_DIR
 
 
+# Filename suffixes returned by get_ttum_files for each requested format
+FORMAT_SUFFIXES = {
+    'all': ('.csv', '.xlsx', '.json'),
+    'csv': ('.csv',),
+    'xlsx': ('.xlsx',),
+}
+
+# xlsx files are already DEFLATE-compressed zip containers; recompressing
+# them costs CPU for no size gain
+PRECOMPRESSED_SUFFIXES = ('.xlsx', '.zip', '.gz')
+# DEFLATE level for text members (csv/json): much faster than the default 6
+# with a near-identical ratio
+ZIP_COMPRESSLEVEL = 1
+
+
+@lru_cache(maxsize=256)
+def _list_ttum(dir_path: str, dir_mtime_ns: int) -> Tuple[str, ...]:
+    """Directory entry names of `dir_path`; `dir_mtime_ns` is the cache key."""
+    with os.scandir(dir_path) as it:
+        return tuple(entry.name for entry in it)
+
+
+def _ttum_files_in(dir_path: str, suffixes: Tuple[str, ...]) -> List[str]:
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return []
+    # Dotfiles are in-flight or leaked temp files (archives, merged outputs)
+    return [
+        os.path.join(dir_path, f) for f in _list_ttum(dir_path, mtime_ns)
+        if f.endswith(suffixes) and not f.startswith('.')
+    ]
+
+
 def get_ttum_files(run_id: str, cycle_id: Optional[str] = None, format: str = 'all') -> List[str]:
-    """Get TTUM files for a run"""
-    ttum_files = []
+    """Get TTUM files for a run
+
+    Directory listings are cached per (path, mtime), so repeated polling
+    only costs one stat per directory until a file is added or removed.
+    """
+    suffixes = FORMAT_SUFFIXES.get(format)
+    if not suffixes:
+        return []
 
     # Check OUTPUT_DIR
     output_ttum = os.path.join(OUTPUT_DIR, run_id, 'ttum')
     if cycle_id:
         output_ttum = os.path.join(OUTPUT_DIR, run_id, f'cycle_{cycle_id}', 'ttum')
-
-    if os.path.exists(output_ttum):
-        for f in os.listdir(output_ttum):
-            if format == 'all':
-                if f.endswith(('.csv', '.xlsx', '.json')):
-                    ttum_files.append(os.path.join(output_ttum, f))
-            elif format == 'csv' and f.endswith('.csv'):
-                ttum_files.append(os.path.join(output_ttum, f))
-            elif format == 'xlsx' and f.endswith('.xlsx'):
-                ttum_files.append(os.path.join(output_ttum, f))
+    ttum_files = _ttum_files_in(output_ttum, suffixes)
 
     # Check UPLOAD_DIR as fallback
     if not ttum_files:
         upload_ttum = os.path.join(UPLOAD_DIR, run_id, 'ttum')
         if cycle_id:
             upload_ttum = os.path.join(UPLOAD_DIR, run_id, f'cycle_{cycle_id}', 'ttum')
-
-        if os.path.exists(upload_ttum):
-            for f in os.listdir(upload_ttum):
-                if format == 'all':
-                    if f.endswith(('.csv', '.xlsx', '.json')):
-                        ttum_files.append(os.path.join(upload_ttum, f))
-                elif format == 'csv' and f.endswith('.csv'):
-                    ttum_files.append(os.path.join(upload_ttum, f))
-                elif format == 'xlsx' and f.endswith('.xlsx'):
-                    ttum_files.append(os.path.join(upload_ttum, f))
+        ttum_files = _ttum_files_in(upload_ttum, suffixes)
 
     return ttum_files
 
 
-def write_ttum_csv(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], data: List[dict]) -> str:
-    """Write TTUM data to CSV"""
-    output_dir = os.path.join(OUTPUT_DIR, run_id, 'ttum')
-    if cycle_id:
-        output_dir = os.path.join(OUTPUT_DIR, run_id, f'cycle_{cycle_id}', 'ttum')
-
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, f"{filename}.csv")
-
-    df = pd.DataFrame(data, columns=headers)
-    df.to_csv(output_path, index=False, encoding='utf-8-sig')
-
-    return output_path
-
-
-def write_ttum_xlsx(run_id: str, cycle_id: Optional[str], filename: str, headers: List[str], data: List[dict]) -> str:
-    """Write TTUM data to XLSX"""
-    output_dir = os.path.join(OUTPUT_DIR, run_id, 'ttum')
-    if cycle_id:
-        output_dir = os.path.join(OUTPUT_DIR, run_id, f'cycle_{cycle_id}', 'ttum')
-
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, f"{filename}.xlsx")
-
-    df = pd.DataFrame(data, columns=headers)
-    df.to_excel(output_path, index=False, engine='openpyxl')
-
-    return output_path
+def ttum_fingerprint(paths: Iterable[str]) -> str:
+    """Short digest of the names, sizes and mtimes of `paths`; vanished files are skipped."""
+    h = hashlib.blake2b(digest_size=8)
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def ttum_zip_path(dest_dir: str, stem: str, paths: List[str]) -> str:
+    """Path of the cached archive of `paths` in dest_dir (it may not exist yet).
+
+    The name carries a fingerprint of the inputs, so unchanged files map to
+    the same archive and any change to them maps to a new one.
+    """
+    return os.path.join(dest_dir, f"{stem}_{ttum_fingerprint(paths)}.zip")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable zip target that tees writes to a file and buffers them for the caller."""
+
+    def __init__(self, f):
+        self._f = f
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._f.write(data)
+        self._chunks.append(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_ttum_zip(zip_path: str, paths: List[str]) -> Iterator[bytes]:
+    """Build the archive at zip_path, yielding its bytes member by member.
+
+    The bytes are sent to the client as each member is compressed, and the
+    same bytes are saved as the cached archive. The temp file is moved into
+    place only if the archive completes; archives cached for older inputs of
+    the same stem are then removed.
+    """
+    dest_dir = os.path.dirname(zip_path)
+    zip_name = os.path.basename(zip_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = os.path.join(dest_dir, f".{zip_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            sink = _ChunkSink(f)
+            # Fast DEFLATE for text; already-compressed members are stored as-is
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL) as zf:
+                for path in paths:
+                    compress_type = zipfile.ZIP_STORED if path.lower().endswith(PRECOMPRESSED_SUFFIXES) else None
+                    zf.write(path, arcname=os.path.basename(path), compress_type=compress_type)
+                    yield sink.drain()
+            yield sink.drain()
+        os.replace(tmp_path, zip_path)
+    except BaseException:
+        # Includes GeneratorExit when the client disconnects mid-download
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Stem is the archive name without its "_<fingerprint>.zip" suffix
+    stale_prefix = zip_name[:zip_name.rindex('_') + 1]
+    with os.scandir(dest_dir) as it:
+        stale = [
+            e.path for e in it
+            if e.name != zip_name and e.name.startswith(stale_prefix) and e.name.endswith('.zip')
+            and len(e.name) == len(zip_name)
+        ]
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,107 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.annexure_iv import (
+    MAX_REPORTED_ERRORS,
+    _iter_normalized,
+    _validate_and_normalize_bulk,
+)
+
+
+def _record(i, **overrides):
+    rec = {
+        'Bankadjref': f'ADJ-{i:05d}',
+        'Flag': 'DRC',
+        'shtdat': '2024-01-15',
+        'adjsmt': '100.50',
+        'Shser': f'{400000000000 + i}',
+        'Shcrd': f'NBIN{i:08d}',
+        'FileName': 'UPI_ADJ_20240115.csv',
+        'reason': '101',
+        'specifyother': 'auto',
+    }
+    rec.update(overrides)
+    return rec
+
+
+def _run(validate, records):
+    try:
+        return list(validate(records)), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def test_bulk_rows_match_scalar_rows():
+    records = [
+        _record(0),
+        _record(1, shtdat='9999-12-31'),
+        _record(2, shtdat='1500-06-01'),
+        _record(3, shtdat=' 2024-1-5 '),
+        _record(4, adjsmt='1.005'),
+        _record(5, adjsmt=10),
+        _record(6, adjsmt=2.5),
+        _record(7, adjsmt='-0.004'),
+        _record(8, Flag=' cr adj '),
+        _record(9, reason=float('nan')),
+        _record(10, reason='TOOLONGREASON', specifyother='x' * 450),
+        _record(11, Bankadjref=float('nan')),
+        _record(12, Flag='RET', reason='R1'),
+    ]
+    del records[0]['reason']
+    del records[0]['specifyother']
+
+    rows, error = _run(_validate_and_normalize_bulk, records)
+    assert error is None
+    assert rows == list(_iter_normalized(records))
+    assert rows[11]['Bankadjref'] == 'nan'
+    assert rows[9]['reason'] == 'nan'
+
+
+@pytest.mark.parametrize('bad', [
+    {'Bankadjref': None},
+    {'Bankadjref': '  '},
+    {'Bankadjref': 'ADJ 1'},
+    {'Bankadjref': 'A' * 101},
+    {'Flag': ''},
+    {'Flag': 'XYZ'},
+    {'shtdat': None},
+    {'shtdat': '2024-02-30'},
+    {'shtdat': '15/01/2024'},
+    {'adjsmt': None},
+    {'adjsmt': ' '},
+    {'adjsmt': float('nan')},
+    {'adjsmt': '1,000.00'},
+    {'Shser': ''},
+    {'Shser': '9' * 51},
+    {'Shcrd': 'N' * 54},
+    {'FileName': 'F' * 51},
+    {'Flag': 'RET', 'reason': None},
+    {'Bankadjref': 'ADJ-00000'},
+])
+def test_bulk_errors_match_scalar_errors(bad):
+    records = [_record(i) for i in range(4)]
+    records[2].update(bad)
+
+    scalar_rows, scalar_error = _run(_iter_normalized, records)
+    bulk_rows, bulk_error = _run(_validate_and_normalize_bulk, records)
+
+    assert scalar_rows is None and bulk_rows is None
+    assert bulk_error.startswith('1 invalid record(s): ')
+    assert bulk_error.split(': ', 1)[1] == scalar_error
+
+
+def test_bulk_error_caps_reported_records():
+    records = [_record(i, Flag='XYZ') for i in range(MAX_REPORTED_ERRORS + 5)]
+
+    _, error = _run(_validate_and_normalize_bulk, records)
+
+    assert error.startswith(f'{MAX_REPORTED_ERRORS + 5} invalid record(s): ')
+    assert error.endswith('; ... and 5 more')
+    assert f'Record index {MAX_REPORTED_ERRORS - 1} invalid' in error
+    assert f'Record index {MAX_REPORTED_ERRORS} invalid' not in error
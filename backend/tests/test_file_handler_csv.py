@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.file_handler import _read_csv_arrow
+
+
+CSV = (
+    "RRN,UPI_Tran_ID,Amount,Tran_Date,Remarks,Status\n"
+    "111111111111,TXN1,100.50,2024-01-15,ok,SUCCESS\n"
+    "222222222222,,200,2024-01-16,,NA\n"
+    "333333333333,TXN3,,2024-01-17,N/A,null\n"
+    "444444444444,NA,300.25,,#N/A,FAILED\n"
+)
+
+
+def test_arrow_reader_matches_read_csv(tmp_path):
+    path = tmp_path / 'cbs_inward.csv'
+    path.write_text(CSV)
+
+    expected = pd.read_csv(path)
+    actual = _read_csv_arrow(str(path))
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_arrow_reader_nulls_blank_and_na_text(tmp_path):
+    path = tmp_path / 'switch.csv'
+    path.write_text(CSV)
+
+    df = _read_csv_arrow(str(path))
+
+    assert df['UPI_Tran_ID'].isna().tolist() == [False, True, False, True]
+    assert df['Remarks'].isna().tolist() == [False, True, True, True]
+    assert df['Status'].isna().tolist() == [False, True, True, False]
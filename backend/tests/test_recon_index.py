@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.recon_index import find_indexed_record, open_recon_index, write_recon_index
+
+
+RESULTS = {
+    'exceptions': [
+        {'rrn': '111111111111', 'upi_tran_id': '', 'amount': 1},
+        {'rrn': '222222222222', 'upi_tran_id': 'TXN2', 'amount': 2},
+        {'rrn': None, 'upi_tran_id': 'TXN3', 'amount': 3},
+    ],
+    'ttum_candidates': [
+        {'rrn': '444444444444', 'amount': 4},
+    ],
+}
+
+
+def _open_index(tmp_path):
+    write_recon_index(str(tmp_path), RESULTS)
+    conn = open_recon_index(str(tmp_path), 0)
+    assert conn is not None
+    return conn
+
+
+def test_rrn_lookup_ignores_empty_txn_id(tmp_path):
+    conn = _open_index(tmp_path)
+    try:
+        section, record = find_indexed_record(conn, '222222222222', '')
+        assert section == 'exceptions'
+        assert record['amount'] == 2
+        section, record = find_indexed_record(conn, '444444444444', None)
+        assert section == 'ttum_candidates'
+        assert record['amount'] == 4
+    finally:
+        conn.close()
+
+
+def test_txn_id_lookup_ignores_empty_rrn(tmp_path):
+    conn = _open_index(tmp_path)
+    try:
+        section, record = find_indexed_record(conn, '', 'TXN3')
+        assert record['amount'] == 3
+        assert find_indexed_record(conn, None, 'TXN9') is None
+    finally:
+        conn.close()
+
+
+def test_empty_keys_match_nothing(tmp_path):
+    conn = _open_index(tmp_path)
+    try:
+        assert find_indexed_record(conn, '', '') is None
+        assert find_indexed_record(conn, None, None) is None
+    finally:
+        conn.close()
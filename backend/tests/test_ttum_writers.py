@@ -0,0 +1,56 @@
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import reporting
+
+
+HEADERS = ['RRN', 'Remarks', 'Tran_Date', 'Value_Date', 'Amount']
+
+
+def test_ttum_xlsx_keeps_text_and_formats_dates(tmp_path, monkeypatch):
+    pytest.importorskip('xlsxwriter')
+    openpyxl = pytest.importorskip('openpyxl')
+    monkeypatch.setattr(reporting, 'OUTPUT_DIR', str(tmp_path))
+
+    rows = (
+        {
+            'RRN': '412345678901',
+            'Remarks': 'http://example.com/refund',
+            'Tran_Date': datetime(2024, 1, 15, 10, 30),
+            'Value_Date': date(2024, 1, 16),
+            'Amount': float('nan'),
+        },
+        {'RRN': '412345678902', 'Remarks': '=1+1', 'Amount': 10.5},
+    )
+    path = reporting.write_ttum_xlsx('RUN_1', None, 'ttum_drc', HEADERS, rows)
+
+    ws = openpyxl.load_workbook(path).active
+    assert [c.value for c in ws[1]] == HEADERS
+    url, formula = ws['B2'], ws['B3']
+    assert url.value == 'http://example.com/refund' and url.hyperlink is None
+    assert formula.value == '=1+1' and formula.data_type == 's'
+    assert ws['C2'].value == datetime(2024, 1, 15, 10, 30)
+    assert ws['C2'].number_format == 'yyyy-mm-dd hh:mm:ss'
+    assert ws['D2'].number_format == 'yyyy-mm-dd'
+    assert ws['E2'].value is None
+    assert ws['E3'].value == 10.5
+
+
+def test_ttum_csv_has_no_bom_and_streams_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'OUTPUT_DIR', str(tmp_path))
+
+    rows = ({'RRN': f'41234567890{i}', 'Remarks': 'a,b' if i else None, 'Amount': i} for i in range(2))
+    path = reporting.write_ttum_csv('RUN_1', '1A', 'ttum_drc', HEADERS, rows)
+
+    assert path == os.path.join(str(tmp_path), 'RUN_1', 'ttum', 'cycle_1A', 'ttum_drc.csv')
+    with open(path, 'rb') as f:
+        assert f.read() == (
+            b'RRN,Remarks,Tran_Date,Value_Date,Amount\r\n'
+            b'412345678900,,,,0\r\n'
+            b'412345678901,"a,b",,,1\r\n'
+        )
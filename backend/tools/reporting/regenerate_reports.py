@@ -53,11 +53,11 @@ if __name__ == "__main__":
         run_id = sys.argv[1]
     else:
         # Use latest run
-        runs = [d for d in os.listdir(OUTPUT_DIR) if d.startswith('RUN_')]
-        if not runs:
+        with os.scandir(OUTPUT_DIR) as it:
+            run_id = max((e.name for e in it if e.name.startswith('RUN_') and e.is_dir()), default=None)
+        if not run_id:
             print("[ERROR] No runs found")
             sys.exit(1)
-        run_id = sorted(runs)[-1]
         print(f"Using latest run: {run_id}")
     
     success = regenerate_reports(run_id)